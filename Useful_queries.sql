@@ -47,7 +47,7 @@ WHERE
 	TRUE
 	AND t.fr24_id IS NULL
 	AND f.fr24_id NOT IN (SELECT DISTINCT fr24_id FROM tracks)
-	AND f.requires_update IS FALSE
+	AND f.requires_update = 0
 	AND f.orig_iata = "ZRH"
 GROUP BY f.orig_iata, f.runway_takeoff
 UNION ALL
@@ -63,7 +63,7 @@ WHERE
 	TRUE
 	AND t.fr24_id IS NULL
 	AND f.fr24_id NOT IN (SELECT DISTINCT fr24_id FROM tracks)
-	AND f.requires_update IS FALSE
+	AND f.requires_update = 0
 	AND f.dest_iata  = "ZRH"
 GROUP BY f.dest_iata, f.runway_takeoff;
 
@@ -82,7 +82,7 @@ WHERE
 	TRUE
 	AND t.fr24_id IS NULL
 	AND f.fr24_id NOT IN (SELECT DISTINCT fr24_id FROM tracks)
-	AND f.requires_update IS FALSE
+	AND f.requires_update = 0
 	AND f.orig_iata = "ZRH"
 GROUP BY f.orig_iata, f.runway_takeoff
 UNION ALL
@@ -98,7 +98,7 @@ WHERE
 	TRUE
 	AND t.fr24_id IS NULL
 	AND f.fr24_id NOT IN (SELECT DISTINCT fr24_id FROM tracks)
-	AND f.requires_update IS FALSE
+	AND f.requires_update = 0
 	AND f.dest_iata  = "ZRH"
 GROUP BY f.dest_iata, f.runway_takeoff)
 WHERE runway IN (10,14,16,28,32,34)
@@ -1,5 +1,6 @@
 """Flight data import module for FlightRadar24 API integration."""
 
+from contextlib import closing
 from datetime import datetime, timedelta, timezone
 import sqlite3
 import time
@@ -8,15 +9,50 @@ from typing import List, Optional, Tuple
 from fr24sdk.client import Client
 from fr24sdk.exceptions import ApiError, Fr24SdkError, RateLimitError
 
+from ..db import connect_db
 from . import SubscriptionPlan
 from .utils import (
-    apply_rate_limit,
+    fetch_rate_limited,
     handle_fr24_exceptions,
     print_summary,
     setup_rate_limiting,
     validate_api_key,
 )
 
+# Maximum number of fr24_ids bound in a single "IN (...)" lookup
+_ID_LOOKUP_CHUNK_SIZE = 500
+
+# Only recent (<24h) incomplete flights require future updates; SQLite derives
+# requires_update from the bound first_seen (?3), takeoff (?10) and landing (?14) values
+_INSERT_FLIGHT_SQL = """
+    INSERT OR IGNORE INTO flights (
+        fr24_id, hex, first_seen, last_seen, flight, type,
+        operating_as, orig_icao, orig_iata, datetime_takeoff,
+        runway_takeoff, dest_icao, dest_iata, datetime_landed,
+        runway_landed, flight_time, actual_distance, last_updated, requires_update
+    ) VALUES (
+        ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12, ?13, ?14, ?15, ?16, ?17, ?18,
+        CASE
+            WHEN ?10 IS NOT NULL AND ?14 IS NOT NULL THEN 0
+            WHEN julianday(?3) < julianday('now', '-1 day') THEN 0
+            ELSE 1
+        END
+    )
+"""
+
+# Takeoff and landing times already known are kept when the API does not return them
+_UPDATE_FLIGHT_SQL = """
+    UPDATE flights SET
+        hex = ?, first_seen = ?, last_seen = ?, flight = ?, type = ?,
+        operating_as = ?, orig_icao = ?, orig_iata = ?,
+        datetime_takeoff = COALESCE(?, datetime_takeoff),
+        runway_takeoff = ?, dest_icao = ?, dest_iata = ?,
+        datetime_landed = COALESCE(?, datetime_landed),
+        runway_landed = ?, flight_time = ?, actual_distance = ?,
+        last_updated = ?, requires_update = ?
+    WHERE fr24_id = ?
+"""
+
 
 def create_flights_table(db_path: str) -> None:
     """Create the flights table if it doesn't exist.
@@ -24,7 +60,7 @@ def create_flights_table(db_path: str) -> None:
     Args:
         db_path: Path to the SQLite database file
     """
-    with sqlite3.connect(db_path) as conn:
+    with connect_db(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS flights (
@@ -46,56 +82,75 @@ def create_flights_table(db_path: str) -> None:
                 flight_time REAL,
                 actual_distance REAL,
                 last_updated TEXT,
-                requires_update BOOLEAN DEFAULT TRUE
+                requires_update INTEGER NOT NULL DEFAULT 1
             )
         """)
 
+        # Partial index covering only the flights update_flights still has to refresh
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_flights_update_queue
+            ON flights (requires_update, first_seen)
+            WHERE requires_update = 1
+        """)
+
+        # One index per airport column so lookups by airport can use an index search
+        # (SQLite can combine them for OR-ed conditions); first_seen makes them covering
+        for column in ("orig_icao", "orig_iata", "dest_icao", "dest_iata"):
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_flights_{column} ON flights ({column}, first_seen)"
+            )
+
         conn.commit()
 
 
 def _get_existing_flight_range(
-    db_path: str, airports: List[str]
+    conn: sqlite3.Connection, airports: List[str]
 ) -> Tuple[Optional[datetime], Optional[datetime]]:
     """Get the range of existing flights for the given airports.
 
     Args:
-        db_path: Path to the SQLite database file
+        conn: Open connection to the SQLite database
         airports: List of airport codes
 
     Returns:
         Tuple of (earliest_first_seen, latest_first_seen) or (None, None) if no flights
     """
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-
-        # Create placeholders for airports
-        airport_placeholders = ",".join(["?" for _ in airports])
-
-        cursor.execute(
-            f"""
-            SELECT MIN(first_seen), MAX(first_seen)
-            FROM flights 
-            WHERE orig_icao IN ({airport_placeholders}) 
-               OR orig_iata IN ({airport_placeholders})
-               OR dest_icao IN ({airport_placeholders})
-               OR dest_iata IN ({airport_placeholders})
-        """,
-            airports * 4,
+    cursor = conn.cursor()
+
+    # Create placeholders for airports
+    airport_placeholders = ",".join(["?" for _ in airports])
+
+    # One subquery per airport column, so each one is an index range on its
+    # (column, first_seen) index
+    cursor.execute(
+        f"""
+        SELECT MIN(first_seen), MAX(first_seen)
+        FROM (
+            SELECT first_seen FROM flights WHERE orig_icao IN ({airport_placeholders})
+            UNION ALL
+            SELECT first_seen FROM flights WHERE orig_iata IN ({airport_placeholders})
+            UNION ALL
+            SELECT first_seen FROM flights WHERE dest_icao IN ({airport_placeholders})
+            UNION ALL
+            SELECT first_seen FROM flights WHERE dest_iata IN ({airport_placeholders})
         )
+    """,
+        airports * 4,
+    )
 
-        result = cursor.fetchone()
+    result = cursor.fetchone()
 
-        if result and result[0] and result[1]:
-            # Parse ISO datetime strings
-            earliest = datetime.fromisoformat(result[0].replace("Z", "+00:00")).replace(
-                tzinfo=None
-            )
-            latest = datetime.fromisoformat(result[1].replace("Z", "+00:00")).replace(
-                tzinfo=None
-            )
-            return earliest, latest
+    if result and result[0] and result[1]:
+        # Parse ISO datetime strings
+        earliest = datetime.fromisoformat(result[0].replace("Z", "+00:00")).replace(
+            tzinfo=None
+        )
+        latest = datetime.fromisoformat(result[1].replace("Z", "+00:00")).replace(
+            tzinfo=None
+        )
+        return earliest, latest
 
-        return None, None
+    return None, None
 
 
 def _generate_time_windows(
@@ -113,16 +168,44 @@ def _generate_time_windows(
     Returns:
         List of (start, end) datetime tuples
     """
-    windows = []
-    current_start = start_datetime
     window_delta = timedelta(hours=max_hours)
 
-    while current_start < end_datetime:
-        current_end = min(current_start + window_delta, end_datetime)
-        windows.append((current_start, current_end))
-        current_start = current_end
+    # Number of windows needed, rounding the last partial window up
+    window_count = -((start_datetime - end_datetime) // window_delta)
+    boundaries = [start_datetime + i * window_delta for i in range(window_count)]
+    boundaries.append(end_datetime)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _generate_time_windows_excluding(
+    start_datetime: datetime,
+    end_datetime: datetime,
+    exclude_start: Optional[datetime],
+    exclude_end: Optional[datetime],
+    max_hours: int = 6,
+) -> List[Tuple[datetime, datetime]]:
+    """Generate time windows covering a range minus an already covered interval.
+
+    Args:
+        start_datetime: Start datetime
+        end_datetime: End datetime
+        exclude_start: Start of the interval to skip, or None to skip nothing
+        exclude_end: End of the interval to skip, or None to skip nothing
+        max_hours: Maximum hours per window
+
+    Returns:
+        List of (start, end) datetime tuples
+    """
+    if exclude_start is None or exclude_end is None:
+        return _generate_time_windows(start_datetime, end_datetime, max_hours)
 
-    return windows
+    # At most two ranges remain: before and after the excluded interval
+    return _generate_time_windows(
+        start_datetime, min(end_datetime, exclude_start), max_hours
+    ) + _generate_time_windows(
+        max(start_datetime, exclude_end), end_datetime, max_hours
+    )
 
 
 @handle_fr24_exceptions("flight import")
@@ -160,180 +243,156 @@ def import_flights(
     # Create table if it doesn't exist
     create_flights_table(db_path)
 
-    # Check existing data to optimize API calls
-    earliest_existing, latest_existing = _get_existing_flight_range(db_path, airports)
+    # A single connection is shared by the whole import to keep its page cache warm
+    with closing(connect_db(db_path)) as conn:
+        # Check existing data to optimize API calls
+        earliest_existing, latest_existing = _get_existing_flight_range(conn, airports)
 
-    # Adjust time range to avoid redundant API calls
-    actual_start = start_datetime
-    actual_end = end_datetime
+        # Only fetch the parts of the requested range not already in the database
+        time_windows = _generate_time_windows_excluding(
+            start_datetime, end_datetime, earliest_existing, latest_existing
+        )
 
-    if earliest_existing and latest_existing:
-        # Check if requested range is completely covered by existing data
-        if start_datetime >= earliest_existing and end_datetime <= latest_existing:
-            # Entire requested range is already covered - no API calls needed
+        if not time_windows:
             print(f"All flights in range {start_datetime} to {end_datetime} already exist in database")
             return 0, 0
-        
-        # Handle partial overlaps - only fetch missing data
-        if start_datetime < earliest_existing:
-            if end_datetime <= earliest_existing:
-                # Entire requested range is before existing data
-                actual_end = earliest_existing
-            # else: Will fetch before existing data, existing logic handles this
-        elif start_datetime <= latest_existing:
-            # Start is within existing range, only fetch after latest_existing
-            if end_datetime > latest_existing:
-                print(f"Data exists from {earliest_existing} to {latest_existing}, only fetching from {latest_existing} onwards")
-                actual_start = latest_existing
-            else:
-                # Entire range is within existing data
-                print(f"All flights in range {start_datetime} to {end_datetime} already exist in database")
-                return 0, 0
-        else:
-            # start_datetime > latest_existing - entire range is after existing data
-            actual_start = start_datetime
-
-    # Generate time windows (max 6 hours each)
-    time_windows = _generate_time_windows(actual_start, actual_end)
-
-    # If we have existing data in the middle, we need to handle gaps
-    if earliest_existing and latest_existing:
-        if start_datetime < earliest_existing and end_datetime > latest_existing:
-            # Need to get data before and after existing range
-            before_windows = _generate_time_windows(start_datetime, earliest_existing)
-            after_windows = _generate_time_windows(latest_existing, end_datetime)
-            time_windows = before_windows + after_windows
-
-    total_imported = 0
-    total_ignored = 0
-    total_fetched = 0
-    all_ignored_ids = []
 
-    # Setup rate limiting
-    sleep_time = setup_rate_limiting(plan)
+        if earliest_existing and latest_existing:
+            print(f"Data exists from {earliest_existing} to {latest_existing}, only fetching outside this range")
 
-    with Client(api_token=fr24_api_key) as client:
-        for i, (window_start, window_end) in enumerate(time_windows):
-            print(f"Fetching flights from {window_start} to {window_end}")
+        total_imported = 0
+        total_ignored = 0
+        total_fetched = 0
+        all_ignored_ids = []
 
-            # Apply rate limiting
-            apply_rate_limit(sleep_time, is_first_request=(i == 0))
+        # Setup rate limiting
+        rate_limiter = setup_rate_limiting(plan)
 
-            summary = client.flight_summary.get_full(
-                airports=airports,
-                flight_datetime_from=window_start,
-                flight_datetime_to=window_end,
-            )
+        with Client(api_token=fr24_api_key) as client:
+
+            def fetch_window(window: Tuple[datetime, datetime]):
+                window_start, window_end = window
+                print(f"Fetching flights from {window_start} to {window_end}")
+                return client.flight_summary.get_full(
+                    airports=airports,
+                    flight_datetime_from=window_start,
+                    flight_datetime_to=window_end,
+                )
+
+            for _, summary in fetch_rate_limited(fetch_window, time_windows, rate_limiter):
+                if not summary.data:
+                    continue
 
-            if not summary.data:
-                continue
+                total_fetched += len(summary.data)
 
-            total_fetched += len(summary.data)
+                imported_count, ignored_count, ignored_ids = _insert_flights(
+                    conn, summary.data
+                )
+                total_imported += imported_count
+                total_ignored += ignored_count
+                all_ignored_ids.extend(ignored_ids)
 
-            imported_count, ignored_count, ignored_ids = _insert_flights(
-                db_path, summary.data
-            )
-            total_imported += imported_count
-            total_ignored += ignored_count
-            all_ignored_ids.extend(ignored_ids)
+                # Release the response before waiting on the next one
+                del summary
 
-        # Print summary
-        summary_data: dict[str, int | str] = {
-            "flights_fetched_from_api": total_fetched,
-            "flights_inserted": total_imported,
-            "flights_ignored_duplicates": total_ignored,
-        }
-        if all_ignored_ids:
-            summary_data["ignored_flight_ids"] = ", ".join(all_ignored_ids)
+            # Print summary
+            summary_data: dict[str, int | str] = {
+                "flights_fetched_from_api": total_fetched,
+                "flights_inserted": total_imported,
+                "flights_ignored_duplicates": total_ignored,
+            }
+            if all_ignored_ids:
+                summary_data["ignored_flight_ids"] = ", ".join(all_ignored_ids)
 
-        print_summary("IMPORT FLIGHTS SUMMARY", **summary_data)
-        return total_imported, total_ignored
+            print_summary("IMPORT FLIGHTS SUMMARY", **summary_data)
+            return total_imported, total_ignored
 
 
-def _insert_flights(db_path: str, flights) -> Tuple[int, int, List[str]]:
+def _insert_flights(
+    conn: sqlite3.Connection, flights
+) -> Tuple[int, int, List[str]]:
     """Insert flights into database, handling duplicates and missing ICAO types.
 
     Args:
-        db_path: Path to the SQLite database file
+        conn: Open connection to the SQLite database
         flights: List of flight data from FR24 API
 
     Returns:
         Tuple of (imported_count, ignored_count, ignored_flight_ids)
     """
-    imported_count = 0
-    ignored_count = 0
-    ignored_flight_ids = []
-
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
+    now_iso = datetime.now(timezone.utc).isoformat()
+
+    rows = [
+        (
+            flight.fr24_id,
+            flight.hex.lower() if flight.hex else None,
+            flight.first_seen,
+            flight.last_seen,
+            flight.flight,
+            flight.type,
+            flight.operating_as,
+            flight.orig_icao,
+            flight.orig_iata,
+            flight.datetime_takeoff,
+            flight.runway_takeoff,
+            flight.dest_icao,
+            flight.dest_iata,
+            flight.datetime_landed,
+            flight.runway_landed,
+            flight.flight_time,
+            flight.actual_distance,
+            now_iso,
+        )
+        for flight in flights
+    ]
 
-        for flight in flights:
-            try:
-                # Determine if flight requires future updates
-                from datetime import datetime, timedelta, timezone
+    if not rows:
+        return 0, 0, []
 
-                # Parse first_seen to check if flight is >24h old
-                first_seen_dt = datetime.fromisoformat(
-                    flight.first_seen.replace("Z", "+00:00")
-                )
-                is_old_flight = (
-                    datetime.now(timezone.utc) - first_seen_dt
-                ) > timedelta(hours=24)
-
-                # Flight has both takeoff and landing data
-                has_complete_data = (
-                    flight.datetime_takeoff is not None
-                    and flight.datetime_landed is not None
-                )
+    requested_ids = [row[0] for row in rows]
 
-                # Only require updates for recent incomplete flights
-                requires_update = not (is_old_flight or has_complete_data)
+    cursor = conn.cursor()
 
-                cursor.execute(
-                    """
-                    INSERT INTO flights (
-                        fr24_id, hex, first_seen, last_seen, flight, type,
-                        operating_as, orig_icao, orig_iata, datetime_takeoff,
-                        runway_takeoff, dest_icao, dest_iata, datetime_landed,
-                        runway_landed, flight_time, actual_distance, last_updated, requires_update
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        flight.fr24_id,
-                        flight.hex.lower() if flight.hex else None,
-                        flight.first_seen,
-                        flight.last_seen,
-                        flight.flight,
-                        flight.type,
-                        flight.operating_as,
-                        flight.orig_icao,
-                        flight.orig_iata,
-                        flight.datetime_takeoff,
-                        flight.runway_takeoff,
-                        flight.dest_icao,
-                        flight.dest_iata,
-                        flight.datetime_landed,
-                        flight.runway_landed,
-                        flight.flight_time,
-                        flight.actual_distance,
-                        datetime.now(timezone.utc).isoformat(),
-                        requires_update,
-                    ),
-                )
+    # Look up which flights already exist (chunked to stay below SQLite's variable limit)
+    existing_ids = set()
+    for i in range(0, len(requested_ids), _ID_LOOKUP_CHUNK_SIZE):
+        chunk = requested_ids[i : i + _ID_LOOKUP_CHUNK_SIZE]
+        placeholders = ",".join(["?" for _ in chunk])
+        cursor.execute(
+            f"SELECT fr24_id FROM flights WHERE fr24_id IN ({placeholders})",
+            chunk,
+        )
+        existing_ids.update(row[0] for row in cursor.fetchall())
 
-                imported_count += 1
+    # Known duplicates are filtered out with a set lookup instead of being sent to SQLite
+    new_rows = [row for row in rows if row[0] not in existing_ids]
 
-            except sqlite3.IntegrityError:
-                # Duplicate fr24_id (primary key violation)
-                ignored_count += 1
-                ignored_flight_ids.append(flight.fr24_id)
-                continue
-            except sqlite3.Error as e:
-                print(f"Warning: Failed to insert flight {flight.fr24_id}: {e}")
-                continue
+    imported_count = 0
+    failed_count = 0
+    if new_rows:
+        try:
+            cursor.executemany(_INSERT_FLIGHT_SQL, new_rows)
+            # rowcount sums the rows actually inserted, so duplicates within the batch are not counted
+            imported_count = cursor.rowcount
+        except sqlite3.Error as e:
+            # Retry one flight at a time so only the failing flights are skipped
+            print(f"Warning: Failed to insert {len(new_rows)} flights at once, retrying one by one: {e}")
+            conn.rollback()
+            for row in new_rows:
+                try:
+                    cursor.execute(_INSERT_FLIGHT_SQL, row)
+                    imported_count += cursor.rowcount
+                except sqlite3.Error as e:
+                    print(f"Warning: Failed to insert flight {row[0]}: {e}")
+                    failed_count += 1
 
         conn.commit()
 
+    ignored_flight_ids = [
+        fr24_id for fr24_id in dict.fromkeys(requested_ids) if fr24_id in existing_ids
+    ]
+    ignored_count = len(rows) - imported_count - failed_count
+
     return imported_count, ignored_count, ignored_flight_ids
 
 
@@ -379,20 +438,22 @@ def update_flights(
     all_incomplete_flight_ids = set()
 
     # Setup rate limiting
-    sleep_time = setup_rate_limiting(plan)
+    rate_limiter = setup_rate_limiting(plan)
 
-    with Client(api_token=fr24_api_key) as client:
-        for window_start, window_end in time_windows:
-            print(f"Updating flights from {window_start} to {window_end}")
+    # A single connection is shared by the whole update to keep its page cache warm
+    with closing(connect_db(db_path)) as conn:
+        cursor = conn.cursor()
+
+        with Client(api_token=fr24_api_key) as client:
+            for window_start, window_end in time_windows:
+                print(f"Updating flights from {window_start} to {window_end}")
 
-            # Get incomplete flights for this specific time window
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
+                # Get incomplete flights for this specific time window
                 cursor.execute(
                     """
                     SELECT fr24_id
                     FROM flights 
-                    WHERE requires_update = TRUE
+                    WHERE requires_update = 1
                       AND first_seen >= ?
                       AND first_seen <= ?
                 """,
@@ -407,89 +468,99 @@ def update_flights(
                 window_incomplete_flight_ids = [row[0] for row in rows]
                 all_incomplete_flight_ids.update(window_incomplete_flight_ids)
 
-            print(
-                f"  Found {len(window_incomplete_flight_ids)} incomplete flights in this window"
-            )
-
-            # Chunk flight IDs into batches of 15 (FR24 API limit)
-            batch_size = 15
-            for i in range(0, len(window_incomplete_flight_ids), batch_size):
-                batch_ids = window_incomplete_flight_ids[i : i + batch_size]
                 print(
-                    f"  Processing batch {i // batch_size + 1}: {len(batch_ids)} flight IDs"
-                )
-
-                # Apply rate limiting (skip delay on first batch of first window)
-                is_first_request = window_start == time_windows[0][0] and i == 0
-                apply_rate_limit(sleep_time, is_first_request=is_first_request)
-
-                summary = client.flight_summary.get_full(
-                    flight_ids=batch_ids,
-                    flight_datetime_from=window_start,
-                    flight_datetime_to=window_end,
+                    f"  Found {len(window_incomplete_flight_ids)} incomplete flights in this window"
                 )
 
-                if not summary.data:
-                    continue
-
-                total_fetched += len(summary.data)
-
-                # Update flights in database
-                with sqlite3.connect(db_path) as conn:
-                    cursor = conn.cursor()
+                # Updates are buffered and written in a single transaction per window,
+                # so no write lock is held while waiting on the API
+                pending_updates = []
+                old_flight_cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+
+                # Chunk flight IDs into batches of 15 (FR24 API limit)
+                batch_size = 15
+                batches = [
+                    window_incomplete_flight_ids[i : i + batch_size]
+                    for i in range(0, len(window_incomplete_flight_ids), batch_size)
+                ]
+
+                def fetch_batch(batch_ids: List[str]):
+                    return client.flight_summary.get_full(
+                        flight_ids=batch_ids,
+                        flight_datetime_from=window_start,
+                        flight_datetime_to=window_end,
+                    )
+
+                for batch_number, (batch_ids, summary) in enumerate(
+                    fetch_rate_limited(fetch_batch, batches, rate_limiter), start=1
+                ):
+                    print(
+                        f"  Processing batch {batch_number}: {len(batch_ids)} flight IDs"
+                    )
+
+                    if not summary.data:
+                        continue
+
+                    total_fetched += len(summary.data)
+
+                    # Load current flight data for the whole batch to see what was missing
+                    batch_placeholders = ",".join(["?" for _ in batch_ids])
+                    cursor.execute(
+                        f"""
+                        SELECT fr24_id, datetime_takeoff, datetime_landed
+                        FROM flights
+                        WHERE fr24_id IN ({batch_placeholders})
+                    """,
+                        batch_ids,
+                    )
+                    current_by_id = {
+                        row[0]: (row[1], row[2]) for row in cursor.fetchall()
+                    }
+
+                    # All flights of a batch share the same update timestamp
+                    now_iso = datetime.now(timezone.utc).isoformat()
 
                     for flight in summary.data:
                         all_found_flight_ids.add(flight.fr24_id)
 
-                        # Check current flight data to see what was missing
-                        cursor.execute(
-                            "SELECT datetime_takeoff, datetime_landed FROM flights WHERE fr24_id = ?",
-                            (flight.fr24_id,),
-                        )
-                        current_data = cursor.fetchone()
+                        if flight.fr24_id not in current_by_id:
+                            continue
 
-                        if current_data:
-                            current_takeoff, current_landed = current_data
+                        current_takeoff, current_landed = current_by_id[flight.fr24_id]
 
-                            # Determine if this update provides new meaningful data
-                            provides_takeoff = (
-                                current_takeoff is None
-                                and flight.datetime_takeoff is not None
-                            )
-                            provides_landing = (
-                                current_landed is None
-                                and flight.datetime_landed is not None
-                            )
+                        # Only count as updated if we filled missing data
+                        provides_new_data = (
+                            current_takeoff is None
+                            and flight.datetime_takeoff is not None
+                        ) or (
+                            current_landed is None
+                            and flight.datetime_landed is not None
+                        )
+                        updated_count += provides_new_data
 
-                            # Check if flight no longer requires updates after this update
-                            has_complete_data_after_update = (
-                                current_takeoff is not None
-                                or flight.datetime_takeoff is not None
-                            ) and (
-                                current_landed is not None
-                                or flight.datetime_landed is not None
-                            )
+                        # Check if flight is >24h old
+                        is_old_flight = bool(flight.first_seen) and (
+                            datetime.fromisoformat(flight.first_seen) < old_flight_cutoff
+                        )
 
-                            # Parse first_seen to check if flight is >24h old
-                            is_old_flight = False
-                            if flight.first_seen:
-                                first_seen_dt = datetime.fromisoformat(
-                                    flight.first_seen.replace("Z", "+00:00")
-                                )
-                                is_old_flight = (
-                                    datetime.now(timezone.utc) - first_seen_dt
-                                ) > timedelta(hours=24)
-                            
-                            # Flight no longer requires updates if:
-                            # 1. It now has complete data, OR
-                            # 2. It's old (>24h) AND API didn't provide new data (give up on old flights)
-                            should_stop_updating = (
-                                has_complete_data_after_update
-                                or (is_old_flight and not (provides_takeoff or provides_landing))
-                            )
+                        # Check if flight no longer requires updates after this update
+                        has_complete_data_after_update = (
+                            current_takeoff is not None
+                            or flight.datetime_takeoff is not None
+                        ) and (
+                            current_landed is not None
+                            or flight.datetime_landed is not None
+                        )
 
-                            # Build base update values
-                            update_values = [
+                        # Flight no longer requires updates if:
+                        # 1. It now has complete data, OR
+                        # 2. It's old (>24h) AND API didn't provide new data (give up on old flights)
+                        should_stop_updating = has_complete_data_after_update or (
+                            is_old_flight and not provides_new_data
+                        )
+
+                        pending_updates.append(
+                            (
                                 flight.hex.lower() if flight.hex else None,
                                 flight.first_seen,
                                 flight.last_seen,
@@ -506,63 +577,35 @@ def update_flights(
                                 flight.runway_landed,
                                 flight.flight_time,
                                 flight.actual_distance,
-                            ]
-
-                            # Add update control fields if we should stop updating
-                            if should_stop_updating:
-                                update_sql = """
-                                    UPDATE flights SET
-                                        hex = ?, first_seen = ?, last_seen = ?, flight = ?, type = ?,
-                                        operating_as = ?, orig_icao = ?, orig_iata = ?, datetime_takeoff = ?,
-                                        runway_takeoff = ?, dest_icao = ?, dest_iata = ?, datetime_landed = ?,
-                                        runway_landed = ?, flight_time = ?, actual_distance = ?,
-                                        last_updated = ?, requires_update = ?
-                                    WHERE fr24_id = ?
-                                """
-                                update_values.extend(
-                                    [
-                                        datetime.now(timezone.utc).isoformat(),
-                                        False,  # Stop future updates
-                                        flight.fr24_id,
-                                    ]
-                                )
-                            else:
-                                update_sql = """
-                                    UPDATE flights SET
-                                        hex = ?, first_seen = ?, last_seen = ?, flight = ?, type = ?,
-                                        operating_as = ?, orig_icao = ?, orig_iata = ?, datetime_takeoff = ?,
-                                        runway_takeoff = ?, dest_icao = ?, dest_iata = ?, datetime_landed = ?,
-                                        runway_landed = ?, flight_time = ?, actual_distance = ?
-                                    WHERE fr24_id = ?
-                                """
-                                update_values.append(flight.fr24_id)
-
-                            cursor.execute(update_sql, update_values)
-
-                            # Only count as updated if we filled missing data
-                            if cursor.rowcount > 0 and (
-                                provides_takeoff or provides_landing
-                            ):
-                                updated_count += 1
-
-                    conn.commit()
-
-        # Count flights not found in API response across all windows
-        missing_ids = all_incomplete_flight_ids - all_found_flight_ids
-        not_found_count = len(missing_ids)
-
-        print(
-            f"Found {len(all_incomplete_flight_ids)} total incomplete flights to update"
-        )
+                                now_iso,
+                                int(not should_stop_updating),
+                                flight.fr24_id,
+                            )
+                        )
+
+                if not pending_updates:
+                    continue
+
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.executemany(_UPDATE_FLIGHT_SQL, pending_updates)
+                conn.commit()
+
+            # Count flights not found in API response across all windows
+            missing_ids = all_incomplete_flight_ids - all_found_flight_ids
+            not_found_count = len(missing_ids)
+
+            print(
+                f"Found {len(all_incomplete_flight_ids)} total incomplete flights to update"
+            )
 
-        # Print summary using refactored utility
-        summary_data: dict[str, int | str] = {
-            "flights_fetched_from_api": total_fetched,
-            "flights_updated": updated_count,
-            "flights_not_found": not_found_count,
-        }
-        if missing_ids:
-            summary_data["not_found_flight_ids"] = ", ".join(list(missing_ids))
-
-        print_summary("UPDATE FLIGHTS SUMMARY", **summary_data)
-        return updated_count, not_found_count
+            # Print summary using refactored utility
+            summary_data: dict[str, int | str] = {
+                "flights_fetched_from_api": total_fetched,
+                "flights_updated": updated_count,
+                "flights_not_found": not_found_count,
+            }
+            if missing_ids:
+                summary_data["not_found_flight_ids"] = ", ".join(list(missing_ids))
+
+            print_summary("UPDATE FLIGHTS SUMMARY", **summary_data)
+            return updated_count, not_found_count
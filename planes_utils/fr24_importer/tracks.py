@@ -1,25 +1,39 @@
 """Flight tracks import module for FlightRadar24 API integration."""
 
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import compress
+import json
 import sqlite3
 import time
 from typing import List, Optional, Tuple
 
 from fr24sdk.client import Client
 from fr24sdk.exceptions import ApiError, Fr24SdkError, RateLimitError
+import numpy as np
 
+from ..db import connect_db
 from . import SubscriptionPlan
 from .utils import (
-    apply_rate_limit,
+    fetch_rate_limited,
     handle_fr24_exceptions,
     print_summary,
     setup_rate_limiting,
     validate_api_key,
 )
 
+# Number of buffered track points written per transaction
+_TRACK_INSERT_BATCH_SIZE = 10_000
 
-@dataclass
+_INSERT_TRACK_SQL = """
+    INSERT OR IGNORE INTO tracks
+    (fr24_id, timestamp, lat, lon, alt, gspeed, vspeed)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@dataclass(frozen=True)
 class BoundingBox:
     """Represents a geographic bounding box."""
 
@@ -51,7 +65,7 @@ def create_tracks_table(db_path: str) -> None:
     Args:
         db_path: Path to the SQLite database file
     """
-    with sqlite3.connect(db_path) as conn:
+    with closing(connect_db(db_path)) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS tracks (
@@ -66,9 +80,76 @@ def create_tracks_table(db_path: str) -> None:
                 FOREIGN KEY (fr24_id) REFERENCES flights (fr24_id)
             )
         """)
+
+        # Covering index so a flight's bounding box can be read without touching the table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracks_bounds
+            ON tracks (fr24_id, lat, lon)
+        """)
         conn.commit()
 
 
+def _insert_track_points(
+    conn: sqlite3.Connection, track_points: List[Tuple]
+) -> int:
+    """Insert a batch of track points in a single transaction.
+
+    Args:
+        conn: Open SQLite connection
+        track_points: Rows of (fr24_id, timestamp, lat, lon, alt, gspeed, vspeed)
+
+    Returns:
+        Number of track points actually inserted (duplicates are ignored)
+    """
+    changes_before = conn.total_changes
+    with conn:
+        conn.executemany(_INSERT_TRACK_SQL, track_points)
+    return conn.total_changes - changes_before
+
+
+def _filter_track_points(
+    fr24_id: str, points: List, bounding_box: BoundingBox
+) -> List[Tuple]:
+    """Keep the track points inside the bounding box that aren't taxiing.
+
+    The checks run as vectorized NumPy masks over the whole track rather than per point.
+
+    Args:
+        fr24_id: Flight ID the points belong to
+        points: Track points returned by the FR24 API
+        bounding_box: Geographic bounding box to keep points in
+
+    Returns:
+        Rows of (fr24_id, timestamp, lat, lon, alt, gspeed, vspeed) ready for insertion
+    """
+    lat, lon, alt, gspeed = np.array(
+        [(point.lat, point.lon, point.alt, point.gspeed) for point in points],
+        dtype=np.float64,
+    ).reshape(-1, 4).T
+
+    keep = (
+        (lat >= bounding_box.latitude_min)
+        & (lat <= bounding_box.latitude_max)
+        & (lon >= bounding_box.longitude_min)
+        & (lon <= bounding_box.longitude_max)
+        # Skip taxiing points (altitude 0 with ground speed <= 20)
+        & ~((alt == 0) & (gspeed <= 20))
+    )
+
+    return [
+        (
+            fr24_id,
+            point.timestamp,
+            point.lat,
+            point.lon,
+            point.alt,
+            point.gspeed,
+            point.vspeed,
+        )
+        for point in compress(points, keep)
+    ]
+
+
 @handle_fr24_exceptions("tracks population")
 def populate_tracks(
     db_path: str,
@@ -107,146 +188,160 @@ def populate_tracks(
     create_tracks_table(db_path)
 
     # Get complete flights that don't have tracks yet
-    complete_flight_ids = []
-
-    with sqlite3.connect(db_path) as conn:
+    with closing(sqlite3.connect(db_path)) as conn:
         cursor = conn.cursor()
 
         # Build the SQL query with optional filters
         query = """
             SELECT f.fr24_id
             FROM flights f
-            WHERE f.requires_update = FALSE
-              AND f.fr24_id NOT IN (SELECT DISTINCT fr24_id FROM tracks)
+            WHERE f.requires_update = 0
+              AND NOT EXISTS (SELECT 1 FROM tracks t WHERE t.fr24_id = f.fr24_id)
         """
 
         params = []
 
-        # Add airport filters (OR between origin and destination)
-        airport_conditions = []
-        
-        if origin_airport:
-            runway_placeholders = ",".join(["?" for _ in origin_airport.runways])
-            airport_conditions.append(f"((f.orig_icao = ? OR f.orig_iata = ?) AND f.runway_takeoff IN ({runway_placeholders}))")
-            params.extend([origin_airport.icao, origin_airport.iata] + origin_airport.runways)
-        
-        if destination_airport:
-            runway_placeholders = ",".join(["?" for _ in destination_airport.runways])
-            airport_conditions.append(f"((f.dest_icao = ? OR f.dest_iata = ?) AND f.runway_landed IN ({runway_placeholders}))")
-            params.extend([destination_airport.icao, destination_airport.iata] + destination_airport.runways)
-        
-        if airport_conditions:
-            query += f" AND ({' OR '.join(airport_conditions)})"
+        # Datetime filters
+        date_conditions = ""
+        date_params = []
 
-        # Add datetime filters
         if start_datetime:
-            query += " AND f.first_seen >= ?"
-            params.append(start_datetime.isoformat() + "Z")
+            date_conditions += " AND first_seen >= ?"
+            date_params.append(start_datetime.isoformat() + "Z")
 
         if end_datetime:
-            query += " AND f.first_seen <= ?"
-            params.append(end_datetime.isoformat() + "Z")
+            date_conditions += " AND first_seen <= ?"
+            date_params.append(end_datetime.isoformat() + "Z")
+
+        # Airport filters: one SELECT per airport code, combined with UNION, so each of
+        # them can use the (airport column, first_seen) index instead of a table scan
+        candidate_queries = []
+
+        for airport, code_columns, runway_column in (
+            (origin_airport, ("orig_icao", "orig_iata"), "runway_takeoff"),
+            (destination_airport, ("dest_icao", "dest_iata"), "runway_landed"),
+        ):
+            if not airport:
+                continue
+
+            # Runways are bound as one JSON array so the SQL text doesn't depend on their count
+            runways_json = json.dumps(airport.runways)
+            for code_column, code in zip(code_columns, (airport.icao, airport.iata)):
+                if code is None:
+                    continue
+                candidate_queries.append(
+                    f"SELECT fr24_id FROM flights WHERE {code_column} = ?"
+                    f" AND {runway_column} IN (SELECT value FROM json_each(?))"
+                    f"{date_conditions}"
+                )
+                params.extend([code, runways_json] + date_params)
+
+        if candidate_queries:
+            query += f" AND f.fr24_id IN ({' UNION '.join(candidate_queries)})"
+        elif origin_airport or destination_airport:
+            # Airports without any code can't match a flight
+            query += " AND 0"
+        else:
+            query += date_conditions.replace("first_seen", "f.first_seen")
+            params.extend(date_params)
 
         print(f"DEBUG: SQL Query: {query}")
         print(f"DEBUG: Parameters: {params}")
         
+        # The IDs are read up front so no read transaction stays open during the
+        # rate-limited fetch, which would stop the WAL from being checkpointed
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        if not rows:
+        flight_ids = [row[0] for row in cursor.fetchall()]
+        flight_count = len(flight_ids)
+        if not flight_count:
             print("No complete flights without tracks found")
             return 0, 0, 0, 0
 
-        complete_flight_ids = [row[0] for row in rows]
-
-    print(f"Found {len(complete_flight_ids)} complete flights to fetch tracks for")
+    print(f"Found {flight_count} complete flights to fetch tracks for")
 
     # Setup rate limiting
-    sleep_time = setup_rate_limiting(plan)
+    rate_limiter = setup_rate_limiting(plan)
 
     flights_processed = 0
     track_points_fetched = 0
     track_points_inserted = 0
     flights_not_found = 0
 
-    with Client(api_token=fr24_api_key) as client:
-        for i, fr24_id in enumerate(complete_flight_ids):
-            print(f"Processing flight {i + 1}/{len(complete_flight_ids)}: {fr24_id}")
+    # Track points are buffered and written in large batches over a single connection
+    pending_points = []
 
-            # Apply rate limiting
-            apply_rate_limit(sleep_time, is_first_request=(i == 0))
+    with (
+        closing(connect_db(db_path)) as conn,
+        Client(api_token=fr24_api_key) as client,
+    ):
+        def fetch_tracks(fr24_id: str):
+            return client.flight_tracks.get(fr24_id)
 
-            try:
-                tracks_response = client.flight_tracks.get(fr24_id)
-
-                if not tracks_response.data:
-                    print(f"  No track data found for flight {fr24_id}")
-                    flights_not_found += 1
-                    continue
+        # Tracks are fetched concurrently, but handed back and written in order
+        results = fetch_rate_limited(
+            fetch_tracks, flight_ids, rate_limiter, return_exceptions=True
+        )
 
-                # API returns data=[FlightTracks(fr24_id='...', tracks=[FlightTrackPoint(...), ...])]
-                # We need the tracks list from the first FlightTracks object
-                flight_tracks = (
-                    tracks_response.data[0] if tracks_response.data else None
-                )
-                if not flight_tracks or not flight_tracks.tracks:
-                    print(f"  No track points found for flight {fr24_id}")
-                    flights_not_found += 1
-                    continue
+        try:
+            for i, (fr24_id, tracks_response) in enumerate(results, start=1):
+                print(f"Processing flight {i}/{flight_count}: {fr24_id}")
 
-                # Count all fetched points
-                total_points = len(flight_tracks.tracks)
-                track_points_fetched += total_points
-
-                # Filter points within bounding box and exclude taxiing (alt=0 with low speed)
-                track_points_to_insert = []
-                for point in flight_tracks.tracks:
-                    if bounding_box.contains(point.lat, point.lon):
-                        # Skip taxiing points (altitude 0 with ground speed <= 20)
-                        if point.alt == 0 and point.gspeed <= 20:
-                            continue
-
-                        track_points_to_insert.append(
-                            (
-                                fr24_id,
-                                point.timestamp,
-                                point.lat,
-                                point.lon,
-                                point.alt,
-                                point.gspeed,
-                                point.vspeed,
-                            )
-                        )
+                try:
+                    # Failed calls come back as their exception, handled like any other error
+                    if isinstance(tracks_response, Exception):
+                        raise tracks_response
 
-                if track_points_to_insert:
-                    with sqlite3.connect(db_path) as conn:
-                        cursor = conn.cursor()
-                        cursor.executemany(
-                            """
-                            INSERT OR IGNORE INTO tracks 
-                            (fr24_id, timestamp, lat, lon, alt, gspeed, vspeed)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """,
-                            track_points_to_insert,
-                        )
-                        inserted_count = cursor.rowcount
-                        track_points_inserted += inserted_count
-                        conn.commit()
+                    if not tracks_response.data:
+                        print(f"  No track data found for flight {fr24_id}")
+                        flights_not_found += 1
+                        continue
 
-                    print(
-                        f"  Fetched {total_points} points, inserted {len(track_points_to_insert)} (within bounding box)"
+                    # API returns data=[FlightTracks(fr24_id='...', tracks=[FlightTrackPoint(...), ...])]
+                    # We need the tracks list from the first FlightTracks object
+                    flight_tracks = (
+                        tracks_response.data[0] if tracks_response.data else None
+                    )
+                    if not flight_tracks or not flight_tracks.tracks:
+                        print(f"  No track points found for flight {fr24_id}")
+                        flights_not_found += 1
+                        continue
+
+                    # Count all fetched points
+                    total_points = len(flight_tracks.tracks)
+                    track_points_fetched += total_points
+
+                    # Filter points within bounding box and exclude taxiing (alt=0 with low speed)
+                    track_points_to_insert = _filter_track_points(
+                        fr24_id, flight_tracks.tracks, bounding_box
                     )
-                else:
-                    print(f"  Fetched {total_points} points, 0 within bounding box")
 
-                flights_processed += 1
+                    if track_points_to_insert:
+                        pending_points.extend(track_points_to_insert)
+                        if len(pending_points) >= _TRACK_INSERT_BATCH_SIZE:
+                            track_points_inserted += _insert_track_points(
+                                conn, pending_points
+                            )
+                            pending_points = []
 
-            except Exception as e:
-                if "not found" in str(e).lower():
-                    print(f"  Flight {fr24_id} not found in API")
-                    flights_not_found += 1
-                else:
-                    print(f"  Error processing flight {fr24_id}: {e}")
-                    continue
+                        print(
+                            f"  Fetched {total_points} points, inserted {len(track_points_to_insert)} (within bounding box)"
+                        )
+                    else:
+                        print(f"  Fetched {total_points} points, 0 within bounding box")
+
+                    flights_processed += 1
+
+                except Exception as e:
+                    if "not found" in str(e).lower():
+                        print(f"  Flight {fr24_id} not found in API")
+                        flights_not_found += 1
+                    else:
+                        print(f"  Error processing flight {fr24_id}: {e}")
+                        continue
+        finally:
+            # Write whatever is left, including on interruption
+            if pending_points:
+                track_points_inserted += _insert_track_points(conn, pending_points)
 
         # Print summary
         summary_data = {
@@ -1,13 +1,26 @@
 """Common utilities for FlightRadar24 API integration."""
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import os
+import random
+import threading
 import time
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar
 
-from fr24sdk.exceptions import ApiError, Fr24SdkError, RateLimitError
+from fr24sdk.exceptions import ApiError, Fr24SdkError, RateLimitError, TransportError
 
 from . import SubscriptionPlan
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Maximum number of API calls allowed to be in flight at the same time
+MAX_CONCURRENT_REQUESTS = 4
+
+# Maximum number of attempts for an API call failing with a transient error
+MAX_ATTEMPTS = 5
+
 
 def validate_api_key(fr24_api_key: Optional[str] = None) -> str:
     """Validate and return FR24 API key.
@@ -28,33 +41,217 @@ def validate_api_key(fr24_api_key: Optional[str] = None) -> str:
     return fr24_api_key
 
 
-def setup_rate_limiting(plan: Optional[SubscriptionPlan] = None) -> float:
+class TokenBucket:
+    """Token bucket rate limiter allowing short bursts of requests.
+
+    The bucket holds up to `capacity` tokens and refills continuously at
+    `rate_per_min` tokens per minute. Each request consumes one token and only
+    waits when the bucket is empty.
+
+    The refill rate adapts to the API's feedback (additive increase,
+    multiplicative decrease): it is halved whenever the API reports a rate
+    limit error, then grows back by one request per minute for every
+    successful call, up to `rate_per_min`. Concurrent calls often get throttled
+    by the same burst, so only the first rate limit error within
+    `DECREASE_COOLDOWN` seconds halves the rate.
+    """
+
+    DECREASE_COOLDOWN = 1.0
+
+    def __init__(self, rate_per_min: float, capacity: int):
+        self.max_rate = rate_per_min / 60  # tokens per second
+        self.min_rate = self.max_rate / 16
+        self.rate = self.max_rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.timestamp = time.monotonic()
+        self.last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.timestamp) * self.rate
+        )
+        self.timestamp = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available if needed."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            wait_time = (1 - self.tokens) / self.rate
+            self.tokens -= 1
+
+        time.sleep(wait_time)
+
+    def record_success(self) -> None:
+        """Additively increase the rate after a successful call."""
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + 1 / 60)
+
+    def record_rate_limited(self) -> None:
+        """Halve the rate and drop any burst allowance after a rate limit error.
+
+        Errors within DECREASE_COOLDOWN seconds of the last decrease are ignored, as
+        they come from the same burst of requests.
+        """
+        with self._lock:
+            self._refill()
+            if self.timestamp - self.last_decrease < self.DECREASE_COOLDOWN:
+                return
+            self.last_decrease = self.timestamp
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+            print(f"Rate limited by the API, slowing down to {self.rate * 60:.1f} requests/minute")
+
+
+def setup_rate_limiting(plan: Optional[SubscriptionPlan] = None) -> Optional[TokenBucket]:
     """Setup rate limiting based on subscription plan.
-    
+
+    The burst size is taken out of the refill rate, so no 60 second span can
+    ever exceed the plan's requests per minute.
+
     Args:
         plan: Optional subscription plan for rate limiting. If None, no rate limiting is applied.
-        
+
     Returns:
-        Sleep time between requests in seconds (0 if no rate limiting)
+        Token bucket to acquire before each request (None if no rate limiting)
     """
     if not plan:
-        return 0
-    
+        return None
+
     request_rate_limit = plan.value.request_rate_limit
-    sleep_time = 60 / request_rate_limit  # Convert requests/minute to seconds between requests
-    print(f"Rate limit: {request_rate_limit} requests/minute, using {sleep_time:.2f}s delay between requests")
-    return sleep_time
+    burst_size = max(1, request_rate_limit // 6)
+    print(
+        f"Rate limit: {request_rate_limit} requests/minute, "
+        f"allowing bursts of {burst_size} requests"
+    )
+    return TokenBucket(request_rate_limit - burst_size, burst_size)
 
 
-def apply_rate_limit(sleep_time: float, is_first_request: bool = False) -> None:
-    """Apply rate limiting delay if needed.
-    
+def _is_transient(error: Fr24SdkError) -> bool:
+    """Tell whether a failed API call may succeed if asked again.
+
+    Only rate limiting (429), server errors (5xx) and transport errors (network
+    issues, timeouts) are transient. Other client errors, such as a bad token, an
+    invalid request, a missing flight or running out of credits (402), would fail
+    the same way on every attempt.
+    """
+    if isinstance(error, ApiError):
+        status = getattr(error, "status", None)
+        return status is not None and (status == 429 or status >= 500)
+    return isinstance(error, TransportError)
+
+
+def call_with_retry(
+    fetch: Callable[[T], R],
+    request: T,
+    rate_limiter: Optional[TokenBucket] = None,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> R:
+    """Perform an API call, retrying transient errors with exponential backoff.
+
+    The rate limiter is told about every success and rate limit error so it can
+    adapt its rate, and retries acquire a token like any other call.
+
+    Args:
+        fetch: Function performing one API call
+        request: Argument to pass to fetch
+        rate_limiter: Optional token bucket to report to and acquire before retries
+        max_attempts: Maximum number of attempts before giving up
+
+    Returns:
+        The response returned by fetch
+
+    Raises:
+        Fr24SdkError: Right away for a non transient error, or if the last attempt still fails
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response = fetch(request)
+        except Fr24SdkError as e:
+            if rate_limiter and getattr(e, "status", None) == 429:
+                rate_limiter.record_rate_limited()
+            if attempt == max_attempts or not _is_transient(e):
+                raise
+
+            # Exponential backoff with jitter: ~1s, 2s, 4s, ... capped at 60s
+            delay = min(60, 2 ** (attempt - 1)) + random.random()
+            print(f"  {type(e).__name__}: {e}, retrying in {delay:.1f}s ({attempt}/{max_attempts})")
+            time.sleep(delay)
+            if rate_limiter:
+                rate_limiter.acquire()
+            continue
+
+        if rate_limiter:
+            rate_limiter.record_success()
+        return response
+
+
+def _pop_result(pending: deque, return_exceptions: bool = False) -> Tuple:
+    """Pop the oldest pending call and return (request, response).
+
+    Nothing else keeps a reference to the future, so a response is released as
+    soon as the caller is done with it. With return_exceptions, a failed call
+    returns its exception as the response instead of raising it.
+    """
+    request, future = pending.popleft()
+    if return_exceptions and future.exception() is not None:
+        return request, future.exception()
+    return request, future.result()
+
+
+def fetch_rate_limited(
+    fetch: Callable[[T], R],
+    requests: Iterable[T],
+    rate_limiter: Optional[TokenBucket],
+    max_workers: int = MAX_CONCURRENT_REQUESTS,
+    return_exceptions: bool = False,
+) -> Iterator[Tuple[T, R]]:
+    """Run API calls on a thread pool while keeping their start times rate limited.
+
+    Calls are still started only once the rate limiter allows it, but the caller
+    no longer waits for one response before starting the next call, so network
+    latency overlaps the rate limit delay. Results are yielded in request order as
+    soon as available. Each call goes through call_with_retry.
+
     Args:
-        sleep_time: Sleep time in seconds
-        is_first_request: Whether this is the first request (no delay applied)
+        fetch: Function performing one API call
+        requests: Arguments to pass to fetch, one per call
+        rate_limiter: Token bucket acquired before starting each call (None to disable)
+        max_workers: Maximum number of calls in flight at the same time
+        return_exceptions: Yield a failed call's exception as its response instead of raising it
+
+    Yields:
+        Tuples of (request, response)
+
+    Raises:
+        Any exception raised by fetch once retries are exhausted, when its result is reached
+        (unless return_exceptions is set)
     """
-    if sleep_time > 0 and not is_first_request:
-        time.sleep(sleep_time)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+
+    try:
+        for request in requests:
+            if rate_limiter:
+                rate_limiter.acquire()
+            pending.append(
+                (request, executor.submit(call_with_retry, fetch, request, rate_limiter))
+            )
+
+            # Hand back the responses that are already there
+            while pending and pending[0][1].done():
+                yield _pop_result(pending, return_exceptions)
+
+        while pending:
+            yield _pop_result(pending, return_exceptions)
+    finally:
+        executor.shutdown(cancel_futures=True)
 
 
 def handle_fr24_exceptions(operation_name: str):
@@ -1,6 +1,6 @@
 from pathlib import Path
-import sqlite3
 
+from ..db import connect_db
 from .database import create_table_if_not_exists, create_unique_index, insert_records
 from .icao_json import load_json_file
 
@@ -12,8 +12,8 @@ def import_icao_8643(
     """Main function to process all JSON files and load into database."""
     JSON_PATTERN = "*.json"  # Change this to match your JSON files
 
-    # Connect to database
-    conn = sqlite3.connect(database_path)
+    # Connect to database, with the PRAGMAs tuned for bulk loading
+    conn = connect_db(database_path)
     cursor = conn.cursor()
 
     try:
@@ -46,7 +46,7 @@ def import_icao_8643(
                 continue
 
             # Insert records
-            inserted, skipped = insert_records(cursor, records)
+            inserted, skipped = insert_records(conn, records)
 
             total_inserted += inserted
             total_skipped += skipped
@@ -54,9 +54,6 @@ def import_icao_8643(
 
             print(f"  Inserted: {inserted}, Skipped (duplicates): {skipped}")
 
-        # Commit all changes
-        conn.commit()
-
         # Final summary
         print(f"\n" + "=" * 50)
         print(f"SUMMARY")
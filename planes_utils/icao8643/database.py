@@ -33,34 +33,25 @@ def create_unique_index(cursor: sqlite3.Cursor) -> None:
     """)
 
 
-def insert_records(cursor: sqlite3.Cursor, records: List[Dict[str, Any]]) -> tuple:
-    """Insert records using INSERT OR IGNORE to handle duplicates."""
+def insert_records(conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> tuple:
+    """Insert records in a single transaction using INSERT OR IGNORE to handle duplicates."""
 
     insert_sql = """
         INSERT OR IGNORE INTO icao_8643 (
             manufacturer_code, model_no, model_name, model_version,
             engine_count, engine_type, aircraft_desc, description,
             wtc, tdesig, wtg
-        ) VALUES (
-            :manufacturer_code, :model_no, :model_name, :model_version,
-            :engine_count, :engine_type, :aircraft_desc, :description,
-            :wtc, :tdesig, :wtg
-        )
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
 
-    inserted_count = 0
-    skipped_count = 0
-
-    for record in records:
-        cleaned_record = prepare_record(record)
+    cleaned_records = list(map(prepare_record, records))
 
-        # Insert the record
-        cursor.execute(insert_sql, cleaned_record)
+    # Ignored duplicates don't count as changes, so the delta is the number of inserted rows
+    changes_before = conn.total_changes
+    with conn:
+        conn.executemany(insert_sql, cleaned_records)
 
-        # Check if the record was actually inserted
-        if cursor.rowcount > 0:
-            inserted_count += 1
-        else:
-            skipped_count += 1
+    inserted_count = conn.total_changes - changes_before
+    skipped_count = len(cleaned_records) - inserted_count
 
     return inserted_count, skipped_count
@@ -0,0 +1,155 @@
+# Compiled kernels for the distance and noise calculations (requires the optional numba dependency).
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, callers fall back to the NumPy implementation
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+if NUMBA_AVAILABLE:
+
+    # Serial on purpose: tracks are a few hundred points, too few to amortize a parallel
+    # region, and parallel kernels can't be re-entered from several threads on numba's
+    # default workqueue threading layer. Releasing the GIL lets the flights looked up by
+    # calculate_multiple_flights_noise's thread pool run their kernels concurrently.
+    @njit(fastmath=True, cache=True, nogil=True)
+    def min_dist_flight(
+        lats: np.ndarray,
+        lons: np.ndarray,
+        alts: np.ndarray,
+        poi_lat: float,
+        poi_lon: float,
+        poi_alt: float,
+        mode_3d: bool,
+    ) -> Tuple[float, int, float]:
+        """Find the closest point of a track to the POI.
+
+        Each segment is projected analytically onto a tangent plane centred on the POI,
+        then the distance at the projected point is evaluated with the haversine formula.
+
+        Args:
+            lats, lons, alts: Track point coordinates as float arrays (altitude in feet)
+            poi_lat, poi_lon, poi_alt: POI coordinates (altitude in meters)
+            mode_3d: Whether to include the vertical distance
+
+        Returns:
+            Tuple of (min_distance, segment_index, t) where t is the position along the segment
+        """
+        r = 6371000.0
+        poi_lat_r = math.radians(poi_lat)
+        poi_lon_r = math.radians(poi_lon)
+        cos_poi_lat = math.cos(poi_lat_r)
+
+        best_dist = np.inf
+        best_i = 0
+        best_t = 0.0
+
+        for i in range(lats.shape[0] - 1):
+            # Segment endpoints in radians, interpolated in radians directly
+            lat1_r = math.radians(lats[i])
+            lon1_r = math.radians(lons[i])
+            dlat_seg = math.radians(lats[i + 1]) - lat1_r
+            dlon_seg = math.radians(lons[i + 1]) - lon1_r
+
+            # Equirectangular projection to meters, with the POI at the origin
+            x1 = r * cos_poi_lat * (lon1_r - poi_lon_r)
+            y1 = r * (lat1_r - poi_lat_r)
+            dx = r * cos_poi_lat * dlon_seg
+            dy = r * dlat_seg
+            z1 = dz = 0.0
+            if mode_3d:
+                z1 = alts[i] * 0.3048 - poi_alt
+                dz = (alts[i + 1] - alts[i]) * 0.3048
+
+            length_sq = dx * dx + dy * dy + dz * dz
+            t = 0.0
+            if length_sq > 0:
+                t = min(max(-(x1 * dx + y1 * dy + z1 * dz) / length_sq, 0.0), 1.0)
+
+            # Haversine formula at the projected point
+            lat_r = lat1_r + t * dlat_seg
+            dlat = lat_r - poi_lat_r
+            dlon = lon1_r + t * dlon_seg - poi_lon_r
+            a = (
+                math.sin(dlat / 2) ** 2
+                + cos_poi_lat * math.cos(lat_r) * math.sin(dlon / 2) ** 2
+            )
+            distance = 2 * r * math.asin(math.sqrt(a))
+
+            if mode_3d:
+                vertical = z1 + t * dz
+                distance = math.sqrt(distance * distance + vertical * vertical)
+
+            if distance < best_dist:
+                best_dist = distance
+                best_i = i
+                best_t = t
+
+        return best_dist, best_i, best_t
+
+    # Compiled eagerly from the signature, so the first noise calculation doesn't pay for it
+    @njit("UniTuple(float64, 3)(float64, float64, float64, float64)", fastmath=True, cache=True)
+    def noise_kernel(
+        min_distance: float, closest_alt: float, poi_alt_ft: float, baseline: float
+    ) -> Tuple[float, float, float]:
+        """Fused noise model of a single flight, see noise.calculate_aircraft_noise.
+
+        Args:
+            min_distance: Distance from the closest point to the POI in meters
+            closest_alt: Altitude of the closest point in feet
+            poi_alt_ft: POI altitude in feet
+            baseline: Baseline noise in EPNdB
+
+        Returns:
+            Tuple of (distance_attenuation, altitude_correction, final_noise)
+        """
+        distance_attenuation = 0.0
+        if min_distance > 0:
+            distance_attenuation = 20 * math.log10(min_distance * 1e-3) + 5e-5 * (
+                min_distance - 1000.0
+            )
+        # 2 dB per 1000 m of altitude difference, with the difference taken in feet
+        altitude_correction = 6.096e-4 * abs(closest_alt - poi_alt_ft)
+        final_noise = max(baseline - distance_attenuation - altitude_correction, 30.0)
+        return distance_attenuation, altitude_correction, final_noise
+
+    @njit(fastmath=True, cache=True)
+    def noise_kernel_many(
+        min_distances: np.ndarray,
+        closest_alts: np.ndarray,
+        poi_alt_ft: float,
+        baselines: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """noise_kernel over arrays of flights, fused into a single loop.
+
+        Args:
+            min_distances: Distances from the closest points to the POI in meters
+            closest_alts: Altitudes of the closest points in feet
+            poi_alt_ft: POI altitude in feet
+            baselines: Baseline noises in EPNdB
+
+        Returns:
+            Tuple of (distance_attenuations, altitude_corrections, final_noises) arrays
+        """
+        n = min_distances.shape[0]
+        distance_attenuations = np.empty(n)
+        altitude_corrections = np.empty(n)
+        final_noises = np.empty(n)
+        for i in range(n):
+            distance_attenuations[i], altitude_corrections[i], final_noises[i] = (
+                noise_kernel(
+                    min_distances[i], closest_alts[i], poi_alt_ft, float(baselines[i])
+                )
+            )
+        return distance_attenuations, altitude_corrections, final_noises
+
+else:
+    min_dist_flight = None
+    noise_kernel = None
+    noise_kernel_many = None
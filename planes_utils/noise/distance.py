@@ -2,9 +2,25 @@
 
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+from itertools import groupby
+import json
+import logging
 import math
+from operator import itemgetter
 import sqlite3
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+import warnings
+
+import numpy as np
+
+from ..fr24_importer.tracks import BoundingBox
+from ._kernels import min_dist_flight
+
+log = logging.getLogger(__name__)
+
+# Radius of earth in meters
+EARTH_RADIUS_M = 6371000
 
 
 class DistanceType(Enum):
@@ -21,6 +37,11 @@ class POI:
     longitude: float
     altitude: float  # in meters
 
+    @property
+    def altitude_ft(self) -> float:
+        """Altitude in feet, the unit of the track altitudes."""
+        return self.altitude / 0.3048
+
 
 @dataclass
 class TrackPoint:
@@ -32,32 +53,89 @@ class TrackPoint:
     timestamp: str
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate the great circle distance between two points on Earth in meters.
+# Row layout of the tracks query, used to load a whole track in a single conversion.
+# float32 keeps positions to well under a meter at half the memory of float64.
+_TRACK_DTYPE = np.dtype(
+    [("lat", np.float32), ("lon", np.float32), ("alt", np.float32), ("timestamp", "<U32")]
+)
+
+
+@dataclass
+class TrackArrays:
+    """Track of a flight stored as parallel arrays, one element per track point."""
+
+    lats: np.ndarray
+    lons: np.ndarray
+    alts: np.ndarray  # in feet (from FlightRadar24 API)
+    timestamps: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def to_track_points(self) -> List[TrackPoint]:
+        """Convert the arrays back into a list of track points."""
+        return [
+            TrackPoint(
+                latitude=float(lat),
+                longitude=float(lon),
+                altitude=float(alt),
+                timestamp=str(timestamp),
+            )
+            for lat, lon, alt, timestamp in zip(
+                self.lats, self.lons, self.alts, self.timestamps
+            )
+        ]
+
+
+def _haversine_vec(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized great circle distance in meters.
+
+    Accepts scalars or NumPy arrays (in degrees) and broadcasts them against each other.
 
     Args:
-        lat1, lon1: Coordinates of first point
-        lat2, lon2: Coordinates of second point
+        lat1, lon1: Coordinates of first point(s)
+        lat2, lon2: Coordinates of second point(s)
 
     Returns:
-        Distance in meters
+        Array of distances in meters
     """
     # Convert latitude and longitude from degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    lat1, lon1, lat2, lon2 = (np.radians(x) for x in (lat1, lon1, lat2, lon2))
+
+    return _haversine_rad(lat1, lat2 - lat1, lon2 - lon1, np.cos(lat1))
+
+
+def _haversine_rad(lat1, dlat, dlon, cos_lat1) -> np.ndarray:
+    """Great circle distance in meters from a point to offsets from it, in radians.
+
+    Working from offsets keeps full precision for nearby points, even in float32.
+
+    Args:
+        lat1: Latitude of the first point(s) in radians
+        dlat, dlon: Offsets of the second point(s) from the first in radians
+        cos_lat1: Precomputed cosine of lat1
 
+    Returns:
+        Array of distances in meters
+    """
     # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = (
-        math.sin(dlat / 2) ** 2
-        + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-    )
-    c = 2 * math.asin(math.sqrt(a))
+    a = np.sin(dlat / 2) ** 2 + cos_lat1 * np.cos(lat1 + dlat) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(a))
 
-    # Radius of earth in meters
-    r = 6371000
+    return c * EARTH_RADIUS_M
 
-    return c * r
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculate the great circle distance between two points on Earth in meters.
+
+    Args:
+        lat1, lon1: Coordinates of first point
+        lat2, lon2: Coordinates of second point
+
+    Returns:
+        Distance in meters
+    """
+    return float(_haversine_vec(lat1, lon1, lat2, lon2))
 
 
 def distance_3d(poi: POI, lat: float, lon: float, alt: float) -> float:
@@ -83,96 +161,292 @@ def distance_3d(poi: POI, lat: float, lon: float, alt: float) -> float:
     return math.sqrt(horizontal_distance**2 + vertical_distance**2)
 
 
+def _closest_point_on_track(
+    lats: np.ndarray,
+    lons: np.ndarray,
+    alts: np.ndarray,
+    poi: POI,
+    distance_type: DistanceType,
+) -> Tuple[float, float, float, float]:
+    """Find the closest point of a whole track to the POI in one sweep.
+
+    Each segment is short enough for the Earth to be locally flat, so the POI is projected
+    onto every segment analytically in a tangent plane centred on the POI. The distance at
+    the projected point is then evaluated with the haversine formula.
+
+    Args:
+        lats, lons, alts: Track point coordinates (altitude in feet), at least 2 points
+        poi: Point of interest
+        distance_type: Whether to calculate 2D or 3D distance
+
+    Returns:
+        Tuple of (min_distance, closest_lat, closest_lon, closest_alt)
+    """
+    # Work on radian offsets from the POI, computed once and kept in the track's dtype
+    poi_lat_r = math.radians(poi.latitude)
+    cos_poi_lat = math.cos(poi_lat_r)
+    dlats_r = np.radians(lats - poi.latitude)
+    dlons_r = np.radians(lons - poi.longitude)
+
+    # Equirectangular projection to meters, with the POI at the origin
+    x = EARTH_RADIUS_M * cos_poi_lat * dlons_r
+    y = EARTH_RADIUS_M * dlats_r
+    if distance_type == DistanceType.THREE_D:
+        # Convert altitude from feet to meters (1 foot = 0.3048 meters)
+        z = alts * 0.3048 - poi.altitude
+    else:
+        z = np.zeros_like(alts)
+
+    # Position t in [0, 1] of the POI's projection onto each segment
+    dx, dy, dz = np.diff(x), np.diff(y), np.diff(z)
+    length_sq = dx * dx + dy * dy + dz * dz
+    t = np.divide(
+        -(x[:-1] * dx + y[:-1] * dy + z[:-1] * dz),
+        length_sq,
+        out=np.zeros_like(length_sq),
+        where=length_sq > 0,
+    )
+    t = np.clip(t, 0.0, 1.0)
+
+    closest_dlat_r = dlats_r[:-1] + t * np.diff(dlats_r)
+    closest_dlon_r = dlons_r[:-1] + t * np.diff(dlons_r)
+
+    # Calculate distances to POI based on type
+    distances = _haversine_rad(poi_lat_r, closest_dlat_r, closest_dlon_r, cos_poi_lat)
+    if distance_type == DistanceType.THREE_D:
+        distances = np.hypot(distances, z[:-1] + t * dz)
+
+    idx = int(np.argmin(distances))
+    return (
+        float(distances[idx]),
+        poi.latitude + math.degrees(closest_dlat_r[idx]),
+        poi.longitude + math.degrees(closest_dlon_r[idx]),
+        float(alts[idx] + t[idx] * (alts[idx + 1] - alts[idx])),
+    )
+
+
 def interpolate_track_segment(
     point1: TrackPoint,
     point2: TrackPoint,
     poi: POI,
     distance_type: DistanceType,
-    num_interpolation_points: int = 100,
+    num_interpolation_points: Optional[int] = None,
 ) -> Tuple[float, float, float, float]:
-    """Find the closest point on a track segment to the POI using interpolation.
+    """Find the closest point on a track segment to the POI.
 
     Args:
         point1: First track point
         point2: Second track point
         poi: Point of interest
         distance_type: Whether to calculate 2D or 3D distance
-        num_interpolation_points: Number of points to interpolate between track points
+        num_interpolation_points: Deprecated and ignored, the closest point is now
+            found analytically instead of by sampling the segment
 
     Returns:
         Tuple of (min_distance, closest_lat, closest_lon, closest_alt)
         For 2D calculations, closest_alt will be interpolated but not used in distance calculation
     """
-    min_distance = float("inf")
-    closest_lat = closest_lon = closest_alt = 0.0
+    if num_interpolation_points is not None:
+        warnings.warn(
+            "num_interpolation_points is deprecated and ignored, the closest point is "
+            "computed exactly",
+            DeprecationWarning,
+            stacklevel=2,
+        )
 
-    # Linear interpolation between the two points
-    for i in range(num_interpolation_points + 1):
-        t = i / num_interpolation_points  # Parameter from 0 to 1
+    return _closest_point_on_track(
+        np.array([point1.latitude, point2.latitude], dtype=np.float64),
+        np.array([point1.longitude, point2.longitude], dtype=np.float64),
+        np.array([point1.altitude, point2.altitude], dtype=np.float64),
+        poi,
+        distance_type,
+    )
 
-        # Linear interpolation
-        interp_lat = point1.latitude + t * (point2.latitude - point1.latitude)
-        interp_lon = point1.longitude + t * (point2.longitude - point1.longitude)
-        interp_alt = point1.altitude + t * (point2.altitude - point1.altitude)
 
-        # Calculate distance to POI based on type
-        if distance_type == DistanceType.TWO_D:
-            distance = haversine_distance(poi.latitude, poi.longitude, interp_lat, interp_lon)
-        else:  # THREE_D
-            distance = distance_3d(poi, interp_lat, interp_lon, interp_alt)
+def _track_arrays_from_rows(rows: List[Tuple]) -> TrackArrays:
+    """Build read-only track arrays from (lat, lon, alt, timestamp) rows.
 
-        if distance < min_distance:
-            min_distance = distance
-            closest_lat = interp_lat
-            closest_lon = interp_lon
-            closest_alt = interp_alt
+    Args:
+        rows: Track point rows ordered by timestamp
+
+    Returns:
+        Track arrays, read-only since cached tracks are shared between callers
+    """
+    # Convert all rows at once, then split the columns into contiguous arrays
+    records = np.array(rows, dtype=_TRACK_DTYPE)
+    columns = [
+        np.ascontiguousarray(records[name])
+        for name in ("lat", "lon", "alt", "timestamp")
+    ]
+    for column in columns:
+        column.flags.writeable = False
 
-    return min_distance, closest_lat, closest_lon, closest_alt
+    lats, lons, alts, timestamps = columns
+    return TrackArrays(lats=lats, lons=lons, alts=alts, timestamps=timestamps)
+
+
+class _NoTrackPoints(Exception):
+    """Raised by _load_flight_tracks instead of returning an empty track.
+
+    lru_cache doesn't cache exceptions, so flights whose tracks haven't been imported
+    yet are looked up again on the next call.
+    """
+
+
+@lru_cache(maxsize=1024)
+def _load_flight_tracks(
+    fr24_id: str, db_path: str, bounding_box: Optional[BoundingBox]
+) -> TrackArrays:
+    """Load and cache track points for a flight, see get_flight_tracks."""
+    if bounding_box:
+        # Keep or skip the whole flight, dropping single points outside the box would
+        # join points that were never adjacent into fake segments
+        bounds = _get_track_bounds(fr24_id, db_path)
+        if bounds is None:
+            raise _NoTrackPoints(fr24_id)
+
+        min_lat, max_lat, min_lon, max_lon = bounds
+        if (
+            min_lat > bounding_box.latitude_max
+            or max_lat < bounding_box.latitude_min
+            or min_lon > bounding_box.longitude_max
+            or max_lon < bounding_box.longitude_min
+        ):
+            raise _NoTrackPoints(fr24_id)
+
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT lat, lon, alt, timestamp
+            FROM tracks
+            WHERE fr24_id = ?
+            ORDER BY timestamp
+            """,
+            (fr24_id,),
+        )
+        rows = cursor.fetchall()
+
+    if not rows:
+        raise _NoTrackPoints(fr24_id)
+
+    return _track_arrays_from_rows(rows)
 
 
 def get_flight_tracks(
-    fr24_id: str, db_path: str = "planes.sqlite3"
-) -> List[TrackPoint]:
+    fr24_id: str,
+    db_path: str = "planes.sqlite3",
+    bounding_box: Optional[BoundingBox] = None,
+) -> TrackArrays:
     """Get track points for a flight from the database.
 
+    Results are cached, so computing distances from one flight to many POIs only
+    queries the database once. Flights without track points are not cached, so their
+    tracks are found once imported. Call clear_flight_tracks_cache() after re-importing
+    the tracks of a flight.
+
     Args:
         fr24_id: Flight ID
         db_path: Path to SQLite database
+        bounding_box: Optional bounding box. If provided, flights whose track doesn't
+            reach into it are skipped, using the (fr24_id, lat, lon) index. Tracks that
+            do are returned whole, so they can still be used for distance calculations.
 
     Returns:
-        List of track points ordered by timestamp
+        Read-only track arrays ordered by timestamp
     """
-    tracks = []
+    try:
+        return _load_flight_tracks(fr24_id, db_path, bounding_box)
+    except _NoTrackPoints:
+        return _track_arrays_from_rows([])
+    except Exception as e:
+        log.warning("Error fetching tracks for flight %s: %s", fr24_id, e)
+        return _track_arrays_from_rows([])
+
+
+def get_flight_tracks_many(
+    fr24_ids: List[str], db_path: str = "planes.sqlite3"
+) -> Dict[str, TrackArrays]:
+    """Get track points for several flights with a single query.
+
+    Args:
+        fr24_ids: Flight IDs
+        db_path: Path to SQLite database
+
+    Returns:
+        Dictionary mapping each flight ID to its read-only track arrays ordered by
+        timestamp (empty arrays for flights without tracks)
+    """
+    fr24_ids = list(dict.fromkeys(fr24_ids))
+    rows = []
+
+    try:
+        with sqlite3.connect(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT fr24_id, lat, lon, alt, timestamp
+                FROM tracks
+                WHERE fr24_id IN (SELECT value FROM json_each(?))
+                ORDER BY fr24_id, timestamp
+                """,
+                (json.dumps(fr24_ids),),
+            )
+            rows = cursor.fetchall()
+
+    except Exception as e:
+        log.warning("Error fetching tracks for %d flights: %s", len(fr24_ids), e)
+
+    tracks = {fr24_id: _track_arrays_from_rows([]) for fr24_id in fr24_ids}
+    for fr24_id, group in groupby(rows, key=itemgetter(0)):
+        tracks[fr24_id] = _track_arrays_from_rows([row[1:] for row in group])
+
+    return tracks
+
+
+def clear_flight_tracks_cache() -> None:
+    """Forget cached flight tracks, e.g. after new tracks were imported."""
+    _load_flight_tracks.cache_clear()
+
+
+def _get_track_bounds(
+    fr24_id: str, db_path: str = "planes.sqlite3"
+) -> Optional[Tuple[float, float, float, float]]:
+    """Get the bounding box of a flight's track points from the database.
+
+    Args:
+        fr24_id: Flight ID
+        db_path: Path to SQLite database
 
+    Returns:
+        Tuple of (min_lat, max_lat, min_lon, max_lon), or None if the flight has no tracks
+    """
     try:
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
-                SELECT lat, lon, alt, timestamp
+                SELECT MIN(lat), MAX(lat), MIN(lon), MAX(lon)
                 FROM tracks
                 WHERE fr24_id = ?
-                ORDER BY timestamp
                 """,
                 (fr24_id,),
             )
-
-            for row in cursor.fetchall():
-                lat, lon, alt, timestamp = row
-                tracks.append(
-                    TrackPoint(
-                        latitude=lat, longitude=lon, altitude=alt, timestamp=timestamp
-                    )
-                )
+            bounds = cursor.fetchone()
 
     except Exception as e:
-        print(f"Error fetching tracks for flight {fr24_id}: {e}")
+        log.warning("Error fetching track bounds for flight %s: %s", fr24_id, e)
+        return None
 
-    return tracks
+    return None if bounds[0] is None else bounds
 
 
 def get_min_distance_with_details(
-    fr24_id: str, poi: POI, distance_type: DistanceType, db_path: str = "planes.sqlite3"
+    fr24_id: str,
+    poi: POI,
+    distance_type: DistanceType,
+    db_path: str = "planes.sqlite3",
+    max_radius_m: Optional[float] = None,
 ) -> Optional[Tuple[float, float, float, float]]:
     """Calculate minimum distance with details of the closest point.
 
@@ -181,44 +455,61 @@ def get_min_distance_with_details(
         poi: Point of interest with 3D coordinates
         distance_type: Whether to calculate 2D or 3D distance
         db_path: Path to SQLite database
+        max_radius_m: Optional maximum distance of interest. Flights whose track bounding box
+            lies entirely farther away from the POI are skipped without loading their tracks.
 
     Returns:
         Tuple of (min_distance, closest_lat, closest_lon, closest_alt) or None
         For 2D calculations, closest_alt is still returned but distance ignores altitude
     """
+    if max_radius_m is not None:
+        bounds = _get_track_bounds(fr24_id, db_path)
+        if bounds is None:
+            return None
+
+        # The horizontal distance to the nearest point of the bounding box is a lower bound
+        min_lat, max_lat, min_lon, max_lon = bounds
+        nearest_lat = min(max(poi.latitude, min_lat), max_lat)
+        nearest_lon = min(max(poi.longitude, min_lon), max_lon)
+        if haversine_distance(poi.latitude, poi.longitude, nearest_lat, nearest_lon) > max_radius_m:
+            return None
+
     # Get flight tracks
     tracks = get_flight_tracks(fr24_id, db_path)
 
     if len(tracks) < 2:
         return None  # Need at least 2 points to interpolate
 
-    min_distance = float("inf")
-    best_lat = best_lon = best_alt = 0.0
-
-    # Check each track segment
-    for i in range(len(tracks) - 1):
-        point1 = tracks[i]
-        point2 = tracks[i + 1]
-
-        # Find closest point on this segment
-        segment_min_distance, closest_lat, closest_lon, closest_alt = (
-            interpolate_track_segment(point1, point2, poi, distance_type)
-        )
-
-        if segment_min_distance < min_distance:
-            min_distance = segment_min_distance
-            best_lat = closest_lat
-            best_lon = closest_lon
-            best_alt = closest_alt
-
-    if min_distance == float("inf"):
-        return None
-
-    return min_distance, best_lat, best_lon, best_alt
+    # Sweep all segments at once
+    lats, lons, alts = tracks.lats, tracks.lons, tracks.alts
+
+    if min_dist_flight is None:
+        return _closest_point_on_track(lats, lons, alts, poi, distance_type)
+
+    # Compiled kernel, then rebuild the closest point from its segment and position
+    min_distance, i, t = min_dist_flight(
+        lats,
+        lons,
+        alts,
+        poi.latitude,
+        poi.longitude,
+        poi.altitude,
+        distance_type == DistanceType.THREE_D,
+    )
+    return (
+        float(min_distance),
+        float(lats[i] + t * (lats[i + 1] - lats[i])),
+        float(lons[i] + t * (lons[i + 1] - lons[i])),
+        float(alts[i] + t * (alts[i + 1] - alts[i])),
+    )
 
 
 def get_min_distance(
-    fr24_id: str, poi: POI, distance_type: DistanceType, db_path: str = "planes.sqlite3"
+    fr24_id: str,
+    poi: POI,
+    distance_type: DistanceType,
+    db_path: str = "planes.sqlite3",
+    max_radius_m: Optional[float] = None,
 ) -> Optional[float]:
     """Calculate the minimum distance from a flight to a point of interest.
 
@@ -229,10 +520,13 @@ def get_min_distance(
         poi: Point of interest with 3D coordinates
         distance_type: Whether to calculate 2D or 3D distance
         db_path: Path to SQLite database
+        max_radius_m: Optional maximum distance of interest, see get_min_distance_with_details
 
     Returns:
         Minimum distance in meters, or None if no tracks found
     """
-    result = get_min_distance_with_details(fr24_id, poi, distance_type, db_path)
+    result = get_min_distance_with_details(
+        fr24_id, poi, distance_type, db_path, max_radius_m
+    )
     return result[0] if result else None
 
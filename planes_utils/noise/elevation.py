@@ -3,12 +3,142 @@
 import os
 from pathlib import Path
 import subprocess
-from typing import Optional
+import threading
+from typing import Dict, Optional, Tuple, Union
 
+import numpy as np
 import rasterio
+from rasterio.windows import Window, from_bounds
 
 from ..fr24_importer.tracks import BoundingBox
 
+try:
+    import elevation
+except ImportError:  # fall back to running the eio command line tool
+    elevation = None
+
+# Marks pixels of an in-memory DEM without a usable elevation
+_DEM_NODATA = np.iinfo(np.int16).min
+
+
+class DEM:
+    """Elevation raster held in memory, for fast lookups of many coordinates.
+
+    The region of interest is small enough for its DEM to fit in RAM, so the band is
+    read once and coordinates are converted to pixel indices with the inverse affine
+    transform, instead of going through rasterio for every sample.
+
+    Elevations are kept as int16 meters, which covers every plausible elevation, with
+    NoData and out of range pixels replaced by _DEM_NODATA when loading.
+    """
+
+    def __init__(self, dem_file: str, bounding_box: Optional[BoundingBox] = None):
+        """Load the first band of a DEM file.
+
+        Args:
+            dem_file: Path to the DEM raster file
+            bounding_box: Only load the pixels covering this area, coordinates outside
+                of it are treated as outside the raster (default: whole raster)
+        """
+        with rasterio.open(dem_file) as src:
+            if bounding_box is None:
+                band = src.read(1)
+                self.inv = ~src.transform
+            else:
+                window = _covering_window(src, bounding_box)
+                band = src.read(1, window=window)
+                self.inv = ~src.window_transform(window)
+
+            invalid = (band == src.nodata) | (band < -1000) | (band > 10000)
+
+        if np.issubdtype(band.dtype, np.floating):
+            invalid |= np.isnan(band)
+            band = np.rint(band)
+        self.arr = np.where(invalid, _DEM_NODATA, band).astype(np.int16, copy=False)
+
+    def altitudes(
+        self, lon: Union[float, np.ndarray], lat: Union[float, np.ndarray]
+    ) -> np.ndarray:
+        """Get the elevation at the given coordinates.
+
+        Args:
+            lon: Longitude coordinate(s)
+            lat: Latitude coordinate(s)
+
+        Returns:
+            np.ndarray: Elevations in meters as float32, NaN outside the raster or
+            where the value is NoData or out of a plausible range
+        """
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+
+        # Note: the affine transform works on (x, y) = (longitude, latitude)
+        c, r = self.inv * (lon, lat)
+        c = np.floor(c).astype(np.intp)
+        r = np.floor(r).astype(np.intp)
+        height, width = self.arr.shape
+        outside = (r < 0) | (r >= height) | (c < 0) | (c >= width)
+
+        v = self.arr[np.clip(r, 0, height - 1), np.clip(c, 0, width - 1)]
+
+        # Only convert to float at the end, to mark missing values as NaN
+        return np.where(outside | (v == _DEM_NODATA), np.nan, v.astype(np.float32))
+
+
+def _covering_window(src: rasterio.DatasetReader, bounding_box: BoundingBox) -> Window:
+    """Get the window of whole pixels covering a bounding box, clipped to the raster.
+
+    Args:
+        src: Open rasterio dataset
+        bounding_box: Area to cover
+
+    Returns:
+        Window: Pixel window to read
+    """
+    window = from_bounds(
+        bounding_box.longitude_min,
+        bounding_box.latitude_min,
+        bounding_box.longitude_max,
+        bounding_box.latitude_max,
+        src.transform,
+    )
+    col_off = int(np.floor(window.col_off))
+    row_off = int(np.floor(window.row_off))
+    col_end = int(np.ceil(window.col_off + window.width))
+    row_end = int(np.ceil(window.row_off + window.height))
+    return Window(col_off, row_off, col_end - col_off, row_end - row_off).intersection(
+        Window(0, 0, src.width, src.height)
+    )
+
+
+# Loaded DEMs by absolute path and bounding box (None for the whole raster)
+_dem_cache: Dict[Tuple[str, Optional[BoundingBox]], DEM] = {}
+_dem_lock = threading.Lock()
+
+
+def _get_dem(dem_file: str, bounding_box: Optional[BoundingBox] = None) -> DEM:
+    """Get the in-memory DEM for a file, loading it on first use.
+
+    Args:
+        dem_file: Path to the DEM raster file
+        bounding_box: Only load the pixels covering this area (default: whole raster)
+
+    Returns:
+        DEM: Loaded elevation raster
+    """
+    key = (os.path.abspath(dem_file), bounding_box)
+    with _dem_lock:
+        dem = _dem_cache.get(key)
+        if dem is None:
+            dem = _dem_cache[key] = DEM(key[0], bounding_box)
+    return dem
+
+
+def clear_dem_cache() -> None:
+    """Forget all loaded DEMs, so they are read again from disk on next use."""
+    with _dem_lock:
+        _dem_cache.clear()
+
 
 def download_elevation_data(
     bounding_box: BoundingBox,
@@ -27,11 +157,65 @@ def download_elevation_data(
     Returns:
         bool: True if download was successful, False otherwise
     """
+    # Forget loaded DEMs, which may come from the file about to be replaced
+    clear_dem_cache()
+
     # Remove existing file if it exists
     if os.path.exists(output_file):
         print(f"🗑️ Removing existing file: {output_file}")
         os.remove(output_file)
 
+    if elevation is None:
+        return _download_with_eio(bounding_box, output_file, product, clean_cache)
+
+    # Clean cache first as preventive measure
+    if clean_cache:
+        print(f"🧹 Cleaning {product} cache first...")
+        try:
+            elevation.clean(product=product)
+            print("Cache cleaned successfully")
+        except Exception:
+            print("Cache clean failed, but continuing...")
+
+    bounds = (
+        bounding_box.longitude_min,
+        bounding_box.latitude_min,
+        bounding_box.longitude_max,
+        bounding_box.latitude_max,
+    )
+    print(f"Clipping {product} data to bounds {bounds}")
+
+    try:
+        # elevation writes relative output paths inside its cache directory
+        elevation.clip(
+            bounds=bounds, output=os.path.abspath(output_file), product=product
+        )
+        print("✅ DEM download completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Error downloading {product} data: {e}")
+        _print_fallback_hint(product)
+        return False
+
+    return _check_output_file(output_file)
+
+
+def _download_with_eio(
+    bounding_box: BoundingBox, output_file: str, product: str, clean_cache: bool
+) -> bool:
+    """Download elevation data by running the eio command line tool.
+
+    Used when the elevation package can't be imported in this interpreter.
+
+    Args:
+        bounding_box: BoundingBox object defining the area of interest
+        output_file: Output filename for the DEM file
+        product: SRTM product to use - "SRTM1" (30m) or "SRTM3" (90m)
+        clean_cache: Whether to clean the cache before downloading
+
+    Returns:
+        bool: True if download was successful, False otherwise
+    """
     # Prepare the eio command with specified product and bounding box coordinates
     eio_command = [
         "eio",
@@ -68,25 +252,12 @@ def download_elevation_data(
         if result.stderr:
             print(f"Warnings: {result.stderr}")
 
-        # Verify file was created
-        if os.path.exists(output_file):
-            print(f"🎉 DEM file created successfully: {output_file}")
-            return True
-        else:
-            print("⚠️ DEM file was not created")
-            return False
-
     except subprocess.CalledProcessError as e:
         print(f"❌ Error running eio command: {e}")
         print(f"Return code: {e.returncode}")
         print(f"stdout: {e.stdout}")
         print(f"stderr: {e.stderr}")
-
-        # If it still fails, suggest fallback
-        if product == "SRTM1":
-            print("\n⚠️ SRTM1 download failed. Consider trying SRTM3 as fallback:")
-            print("Call the function with product='SRTM3' for 30m resolution data")
-
+        _print_fallback_hint(product)
         return False
 
     except FileNotFoundError:
@@ -95,9 +266,31 @@ def download_elevation_data(
         )
         return False
 
+    return _check_output_file(output_file)
+
+
+def _check_output_file(output_file: str) -> bool:
+    """Verify that the DEM file was created by the download."""
+    if os.path.exists(output_file):
+        print(f"🎉 DEM file created successfully: {output_file}")
+        return True
+    else:
+        print("⚠️ DEM file was not created")
+        return False
+
+
+def _print_fallback_hint(product: str) -> None:
+    """Suggest the lower resolution product after a failed SRTM1 download."""
+    if product == "SRTM1":
+        print("\n⚠️ SRTM1 download failed. Consider trying SRTM3 as fallback:")
+        print("Call the function with product='SRTM3' for 30m resolution data")
+
 
 def get_altitude(
-    latitude: float, longitude: float, dem_file: str = "region-of-interest-DEM.tif"
+    latitude: float,
+    longitude: float,
+    dem_file: str = "region-of-interest-DEM.tif",
+    bounding_box: Optional[BoundingBox] = None,
 ) -> Optional[float]:
     """Get altitude at specific coordinates from a DEM file.
 
@@ -105,6 +298,8 @@ def get_altitude(
         latitude: Latitude coordinate
         longitude: Longitude coordinate
         dem_file: Path to the DEM raster file (default: "region-of-interest-DEM.tif")
+        bounding_box: Only load the part of the DEM covering this area, for large
+            DEM files (default: whole raster)
 
     Returns:
         float: Elevation in meters, or None if unable to determine
@@ -113,24 +308,39 @@ def get_altitude(
         return None
 
     try:
-        with rasterio.open(dem_file) as src:
-            # Sample the elevation at the coordinates
-            # rasterio.sample returns an iterator of arrays, one per coordinate pair
-            coords = [
-                (longitude, latitude)
-            ]  # Note: rasterio expects (x, y) = (longitude, latitude)
-            elevation_values = list(src.sample(coords))
-
-            if elevation_values and len(elevation_values[0]) > 0:
-                elevation = elevation_values[0][0]  # First band, first coordinate
-
-                # Handle NoData values
-                if elevation == src.nodata or elevation < -1000 or elevation > 10000:
-                    return None
-                else:
-                    return float(elevation)
-            else:
-                return None
+        value = _get_dem(dem_file, bounding_box).altitudes(longitude, latitude)
+    except Exception:
+        return None
+
+    return None if np.isnan(value) else float(value)
+
 
+def get_altitudes(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    dem_file: str = "region-of-interest-DEM.tif",
+    bounding_box: Optional[BoundingBox] = None,
+) -> Optional[np.ndarray]:
+    """Get altitudes at many coordinates from a DEM file in a single pass.
+
+    The DEM is loaded into memory on first use, then all coordinates are looked up
+    together.
+
+    Args:
+        latitudes: Latitude coordinates
+        longitudes: Longitude coordinates
+        dem_file: Path to the DEM raster file (default: "region-of-interest-DEM.tif")
+        bounding_box: Only load the part of the DEM covering this area, for large
+            DEM files (default: whole raster)
+
+    Returns:
+        np.ndarray: Elevations in meters, NaN where unable to determine,
+        or None if the DEM file doesn't exist or can't be read
+    """
+    if not os.path.exists(dem_file):
+        return None
+
+    try:
+        return _get_dem(dem_file, bounding_box).altitudes(longitudes, latitudes)
     except Exception:
         return None
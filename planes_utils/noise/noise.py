@@ -1,9 +1,211 @@
-import math
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import json
+import logging
+from math import log10
 import sqlite3
-from typing import Dict, Optional, Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from ._kernels import noise_kernel, noise_kernel_many
 from .distance import POI
 
+log = logging.getLogger(__name__)
+
+_AIRCRAFT_COLUMNS = "tdesig, manufacturer_code, model_no, model_name, wtc, engine_count, engine_type, aircraft_desc"
+
+# The whole icao_8643 table is small enough to be loaded once per database
+_AIRCRAFT_TABLE_SQL = f"""
+    SELECT {_AIRCRAFT_COLUMNS}
+    FROM icao_8643
+"""
+
+_FLIGHT_SQL = """
+    SELECT type, runway_takeoff, runway_landed
+    FROM flights 
+    WHERE fr24_id = ?
+"""
+
+# Aircraft data of many flights at once, the ids are bound as a single JSON array
+_FLIGHTS_AIRCRAFT_SQL = f"""
+    SELECT flights.fr24_id, {_AIRCRAFT_COLUMNS}
+    FROM flights
+    JOIN icao_8643 ON icao_8643.tdesig = flights.type
+    WHERE flights.fr24_id IN (SELECT value FROM json_each(?))
+"""
+
+# Reference distance of the baseline noise levels, in meters (typical ICAO reference)
+_REFERENCE_DISTANCE_M = 1000.0
+_INV_REFERENCE_DISTANCE = 1.0 / _REFERENCE_DISTANCE_M
+
+# Atmospheric absorption (simplified model): 0.005 dB per 100 m beyond the reference distance
+_ABSORPTION_DB_PER_M = 0.005 / 100
+
+# Altitude attenuation (simplified model): ~2 dB per 1000 m of altitude difference
+_ALTITUDE_DB_PER_M = 2.0 / 1000.0
+
+_FEET_TO_METERS = 0.3048
+
+# Altitude attenuation per foot, for altitude differences taken in feet like the tracks
+_ALTITUDE_DB_PER_FT = _ALTITUDE_DB_PER_M * _FEET_TO_METERS  # 6.096e-4
+
+# Row and column of each wake turbulence category and engine type in _BASELINE_NOISE
+_WAKE_CATEGORY_INDEX = {'L': 0, 'M': 1, 'H': 2, 'J': 3}  # Light, Medium, Heavy, Super
+_ENGINE_TYPE_INDEX = {'P': 0, 'T': 1, 'J': 2}  # Piston, Turboprop, Jet
+
+# Baseline noise levels (EPNdB) at reference distance (typically flyover)
+# These are approximations - real implementation should use certified data
+# 0 marks combinations without a baseline, which use _DEFAULT_BASELINE_NOISE
+_BASELINE_NOISE = np.array([
+    #  P    T    J
+    [ 75,  80,  85],  # Light (light piston, light turboprops, regional and business jets)
+    [ 78,  88,  95],  # Medium (A320, B737 family)
+    [  0,  92, 105],  # Heavy (A330, B777, etc.; heavy turboprops are rare)
+    [  0,   0, 110],  # Super heavy (A380, B747-8)
+], dtype=np.int16)
+
+_DEFAULT_BASELINE_NOISE = 90
+
+# Read-only connections by thread and database path, so that each query reuses the statement
+# compiled on the first call (sqlite3 caches statements per connection) and threads can query
+# concurrently. Kept in one dict rather than in thread-local storage so they can all be closed.
+_connections: Dict[Tuple[int, str], sqlite3.Connection] = {}
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a read-only SQLite connection tuned for repeated lookups.
+    
+    The connection is used by a single thread at a time, but may be closed from another one.
+    
+    Args:
+        db_path: Path to SQLite database
+        
+    Returns:
+        Open SQLite connection
+    """
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.executescript(
+        """
+        PRAGMA query_only=1;
+        PRAGMA cache_size=-65536;
+        PRAGMA mmap_size=268435456;
+        PRAGMA temp_store=MEMORY;
+        """
+    )
+    return conn
+
+
+def _fetchall(db_path: str, sql: str, *params) -> List[tuple]:
+    """Run a query on the current thread's connection to a database.
+    
+    Args:
+        db_path: Path to SQLite database
+        sql: Query to run
+        *params: Values bound to the query parameters
+        
+    Returns:
+        All rows of the result
+    """
+    key = (threading.get_ident(), db_path)
+    conn = _connections.get(key)
+    if conn is None:
+        conn = _connections[key] = _connect(db_path)
+    return conn.execute(sql, params).fetchall()
+
+
+def _fetchone(db_path: str, sql: str, key: str) -> Optional[tuple]:
+    """Run a point query on the current thread's connection to a database.
+    
+    Args:
+        db_path: Path to SQLite database
+        sql: Query with a single parameter
+        key: Value bound to the parameter
+        
+    Returns:
+        First row of the result, or None if there is none
+    """
+    rows = _fetchall(db_path, sql, key)
+    return rows[0] if rows else None
+
+
+def _aircraft_from_row(row: tuple) -> Dict:
+    """Build the aircraft data dictionary from an icao_8643 row.
+    
+    Args:
+        row: Values of the _AIRCRAFT_COLUMNS columns
+        
+    Returns:
+        Dictionary with aircraft data, as returned by get_aircraft_noise_data
+    """
+    return {
+        'type_designator': row[0],
+        'manufacturer': row[1],
+        'model': row[2],
+        'type_name': row[3],
+        'wake_category': row[4],  # L=Light, M=Medium, H=Heavy, J=Super
+        'engines': row[5],
+        'engine_type': row[6],    # P=Piston, T=Turboprop, J=Jet
+        'aircraft_category': row[7]
+    }
+
+
+def get_flights_aircraft_data(flight_ids: List[str], db_path: str = "planes.sqlite3") -> Dict[str, Dict]:
+    """Get aircraft data for many flights with a single query.
+    
+    Args:
+        flight_ids: Flight IDs to look up
+        db_path: Path to SQLite database
+        
+    Returns:
+        Dictionary mapping flight_id to aircraft data, as returned by get_aircraft_noise_data.
+        Flights that are missing or whose aircraft type is unknown are left out.
+    """
+    try:
+        rows = _fetchall(db_path, _FLIGHTS_AIRCRAFT_SQL, json.dumps(list(flight_ids)))
+    except Exception as e:
+        log.warning("Error fetching aircraft data for %d flights: %s", len(flight_ids), e)
+        return {}
+    
+    return {row[0]: _aircraft_from_row(row[1:]) for row in rows}
+
+
+@lru_cache(maxsize=8)
+def _load_aircraft_table(db_path: str) -> Dict[str, Dict]:
+    """Load the aircraft data of every type, so lookups don't need to query the database.
+    
+    Errors propagate so they are not cached.
+    """
+    return {row[0]: _aircraft_from_row(row) for row in _fetchall(db_path, _AIRCRAFT_TABLE_SQL)}
+
+
+def clear_aircraft_data_cache() -> None:
+    """Forget cached aircraft data, e.g. after the ICAO 8643 data was re-imported."""
+    _load_aircraft_table.cache_clear()
+
+
+def close_noise_connections() -> None:
+    """Close the database connections opened by the noise lookups.
+    
+    Must not be called while lookups are running, later lookups open new connections.
+    Connections left open are closed when the interpreter exits.
+    """
+    while _connections:
+        _, conn = _connections.popitem()
+        conn.close()
+
+
+atexit.register(close_noise_connections)
+
+
+def _close_thread_connections() -> None:
+    """Close the database connections opened by the current thread."""
+    thread_id = threading.get_ident()
+    for key in [key for key in _connections if key[0] == thread_id]:
+        _connections.pop(key).close()
+
 
 def get_aircraft_noise_data(aircraft_type: str, db_path: str = "planes.sqlite3") -> Optional[Dict]:
     """Get aircraft noise and specification data from the database.
@@ -17,34 +219,14 @@ def get_aircraft_noise_data(aircraft_type: str, db_path: str = "planes.sqlite3")
         or None if not found
     """
     try:
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT tdesig, manufacturer_code, model_no, model_name, wtc, engine_count, engine_type, aircraft_desc
-                FROM icao_8643 
-                WHERE tdesig = ?
-                """,
-                (aircraft_type,)
-            )
-            row = cursor.fetchone()
-            if row:
-                return {
-                    'type_designator': row[0],
-                    'manufacturer': row[1],
-                    'model': row[2],
-                    'type_name': row[3],
-                    'wake_category': row[4],  # L=Light, M=Medium, H=Heavy, J=Super
-                    'engines': row[5],
-                    'engine_type': row[6],    # P=Piston, T=Turboprop, J=Jet
-                    'aircraft_category': row[7]
-                }
+        return _load_aircraft_table(db_path).get(aircraft_type)
     except Exception as e:
-        print(f"Error fetching aircraft data for {aircraft_type}: {e}")
+        log.warning("Error fetching aircraft data for %s: %s", aircraft_type, e)
     
     return None
 
 
+@lru_cache(maxsize=32)
 def get_baseline_noise_by_category(wake_category: str, engine_type: str) -> float:
     """Get baseline noise level in EPNdB based on aircraft category.
     
@@ -59,26 +241,27 @@ def get_baseline_noise_by_category(wake_category: str, engine_type: str) -> floa
     Returns:
         Baseline noise level in EPNdB at reference conditions
     """
-    # Baseline noise levels (EPNdB) at reference distance (typically flyover)
-    # These are approximations - real implementation should use certified data
-    baseline_noise = {
-        # Jet aircraft
-        ('L', 'J'): 85,   # Light jets (regional jets, business jets)
-        ('M', 'J'): 95,   # Medium jets (A320, B737 family)
-        ('H', 'J'): 105,  # Heavy jets (A330, B777, etc.)
-        ('J', 'J'): 110,  # Super heavy (A380, B747-8)
-        
-        # Turboprop aircraft
-        ('L', 'T'): 80,   # Light turboprops
-        ('M', 'T'): 88,   # Medium turboprops
-        ('H', 'T'): 92,   # Heavy turboprops (rare)
+    return get_baseline_noises([wake_category], [engine_type])[0].item()
+
+
+def get_baseline_noises(wake_categories: List[str], engine_types: List[str]) -> np.ndarray:
+    """Vectorized get_baseline_noise_by_category for many aircraft at once.
+    
+    Args:
+        wake_categories: Wake turbulence categories (L, M, H, J)
+        engine_types: Engine types (P, T, J), in the same order
         
-        # Piston aircraft
-        ('L', 'P'): 75,   # Light piston aircraft
-        ('M', 'P'): 78,   # Medium piston aircraft
-    }
+    Returns:
+        Baseline noise levels in EPNdB at reference conditions
+    """
+    wake_idx = np.array([_WAKE_CATEGORY_INDEX.get(c, -1) for c in wake_categories], dtype=np.intp)
+    engine_idx = np.array([_ENGINE_TYPE_INDEX.get(e, -1) for e in engine_types], dtype=np.intp)
     
-    return baseline_noise.get((wake_category, engine_type), 90)  # Default fallback
+    baselines = _BASELINE_NOISE[wake_idx, engine_idx]
+    
+    # Unknown codes (index -1) and combinations without a baseline (0) use the fallback
+    missing = (wake_idx < 0) | (engine_idx < 0) | (baselines == 0)
+    return np.where(missing, _DEFAULT_BASELINE_NOISE, baselines)
 
 
 def calculate_distance_attenuation(distance_meters: float) -> float:
@@ -96,17 +279,13 @@ def calculate_distance_attenuation(distance_meters: float) -> float:
     if distance_meters <= 0:
         return 0.0
     
-    reference_distance = 1000.0  # meters (typical ICAO reference)
-    
-    # Spherical spreading: 20*log10(d2/d1)
-    spreading_loss = 20 * math.log10(distance_meters / reference_distance)
-    
-    # Atmospheric absorption (simplified model)
+    # Spherical spreading: 20*log10(d2/d1), plus atmospheric absorption
     # Real implementation would consider frequency, temperature, humidity
     # This is a simplified approximation for mid-frequency noise
-    atmospheric_absorption = 0.005 * (distance_meters - reference_distance) / 100
-    
-    return spreading_loss + atmospheric_absorption
+    return (
+        20 * log10(distance_meters * _INV_REFERENCE_DISTANCE)
+        + _ABSORPTION_DB_PER_M * (distance_meters - _REFERENCE_DISTANCE_M)
+    )
 
 
 def calculate_altitude_correction(aircraft_altitude: float, poi_altitude: float) -> float:
@@ -121,16 +300,107 @@ def calculate_altitude_correction(aircraft_altitude: float, poi_altitude: float)
     Returns:
         Additional attenuation in dB
     """
-    # Convert aircraft altitude from feet to meters
-    aircraft_altitude_meters = aircraft_altitude * 0.3048
+    # Convert aircraft altitude from feet to meters, every 1000m of difference adds ~2dB
+    return _ALTITUDE_DB_PER_M * abs(aircraft_altitude * _FEET_TO_METERS - poi_altitude)
+
+
+def calculate_distance_attenuations(distances_meters: np.ndarray) -> np.ndarray:
+    """Vectorized calculate_distance_attenuation for many distances at once.
     
-    altitude_diff = abs(aircraft_altitude_meters - poi_altitude)
+    Args:
+        distances_meters: Distances from aircraft to POI in meters
+        
+    Returns:
+        Attenuations in dB, 0 where the distance is not positive
+    """
+    distances_meters = np.asarray(distances_meters, dtype=np.float64)
     
-    # Additional attenuation for altitude (simplified model)
-    # Every 1000m of altitude difference adds ~2dB attenuation
-    altitude_attenuation = (altitude_diff / 1000.0) * 2.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spreading_loss = 20 * np.log10(distances_meters * _INV_REFERENCE_DISTANCE)
+    atmospheric_absorption = _ABSORPTION_DB_PER_M * (distances_meters - _REFERENCE_DISTANCE_M)
     
-    return altitude_attenuation
+    return np.where(distances_meters > 0, spreading_loss + atmospheric_absorption, 0.0)
+
+
+def calculate_altitude_corrections(aircraft_altitudes: np.ndarray, poi_altitude: float) -> np.ndarray:
+    """Vectorized calculate_altitude_correction for many aircraft altitudes at once.
+    
+    Args:
+        aircraft_altitudes: Aircraft altitudes in feet (from FlightRadar24 API)
+        poi_altitude: POI altitude in meters
+        
+    Returns:
+        Additional attenuations in dB
+    """
+    aircraft_altitudes_meters = np.asarray(aircraft_altitudes, dtype=np.float64) * _FEET_TO_METERS
+    return _ALTITUDE_DB_PER_M * np.abs(aircraft_altitudes_meters - poi_altitude)
+
+
+def _final_noise(
+    baselines: np.ndarray, 
+    min_distances: np.ndarray, 
+    closest_alts: np.ndarray, 
+    poi_altitude_ft: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fused noise model for many flights at once.
+    
+    Computes baseline - distance attenuation - altitude correction, floored at the 30 dB
+    background level, in one compiled loop when numba is available and otherwise with
+    in-place NumPy operations to limit temporary arrays.
+    
+    Args:
+        baselines: Baseline noises in EPNdB
+        min_distances: Distances from the closest points to the POI in meters
+        closest_alts: Altitudes of the closest points in feet
+        poi_altitude_ft: POI altitude in feet, see POI.altitude_ft
+        
+    Returns:
+        Tuple of (distance_attenuations, altitude_corrections, final_noises) arrays
+    """
+    min_distances = np.asarray(min_distances, dtype=np.float64)
+    closest_alts = np.asarray(closest_alts, dtype=np.float64)
+    
+    if noise_kernel_many is not None:
+        return noise_kernel_many(min_distances, closest_alts, poi_altitude_ft, baselines)
+    
+    distance_attenuations = calculate_distance_attenuations(min_distances)
+    
+    altitude_corrections = closest_alts - poi_altitude_ft
+    np.abs(altitude_corrections, out=altitude_corrections)
+    altitude_corrections *= _ALTITUDE_DB_PER_FT
+    
+    final_noises = baselines - distance_attenuations
+    final_noises -= altitude_corrections
+    
+    # Ensure noise doesn't go below background level
+    np.maximum(final_noises, 30.0, out=final_noises)
+    
+    return distance_attenuations, altitude_corrections, final_noises
+
+
+def _noise_details(
+    aircraft_data: Dict, 
+    min_distance: float, 
+    closest_alt: float, 
+    baseline_noise: float, 
+    distance_attenuation: float, 
+    altitude_correction: float, 
+    final_noise: float
+) -> Dict:
+    """Build the details dict returned by calculate_aircraft_noise."""
+    return {
+        'aircraft_type': aircraft_data['type_designator'],
+        'manufacturer': aircraft_data['manufacturer'],
+        'model': aircraft_data['model'],
+        'wake_category': aircraft_data['wake_category'],
+        'engine_type': aircraft_data['engine_type'],
+        'min_distance': min_distance,
+        'closest_altitude': closest_alt,
+        'baseline_noise': baseline_noise,
+        'distance_attenuation': distance_attenuation,
+        'altitude_correction': altitude_correction,
+        'final_noise': final_noise
+    }
 
 
 def calculate_aircraft_noise(
@@ -164,23 +434,13 @@ def calculate_aircraft_noise(
     """
     # Get flight details to determine aircraft type
     try:
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT type, runway_takeoff, runway_landed
-                FROM flights 
-                WHERE fr24_id = ?
-                """,
-                (fr24_id,)
-            )
-            flight_row = cursor.fetchone()
-            if not flight_row:
-                return None
-            
-            aircraft_type = flight_row[0]
+        flight_row = _fetchone(db_path, _FLIGHT_SQL, fr24_id)
+        if not flight_row:
+            return None
+        
+        aircraft_type = flight_row[0]
     except Exception as e:
-        print(f"Error fetching flight data for {fr24_id}: {e}")
+        log.warning("Error fetching flight data for %s: %s", fr24_id, e)
         return None
     
     # Get aircraft specifications
@@ -202,31 +462,27 @@ def calculate_aircraft_noise(
         aircraft_data['engine_type']
     )
     
-    # Calculate distance attenuation
-    distance_attenuation = calculate_distance_attenuation(min_distance)
-    
-    # Calculate altitude correction
-    altitude_correction = calculate_altitude_correction(closest_alt, poi.altitude)
-    
-    # Final noise calculation
-    final_noise = baseline_noise - distance_attenuation - altitude_correction
-    
-    # Ensure noise doesn't go below background level
-    final_noise = max(final_noise, 30.0)  # Minimum background noise level
+    if noise_kernel is not None:
+        distance_attenuation, altitude_correction, final_noise = noise_kernel(
+            min_distance, closest_alt, poi.altitude_ft, baseline_noise
+        )
+    else:
+        # Calculate distance attenuation
+        distance_attenuation = calculate_distance_attenuation(min_distance)
+        
+        # Calculate altitude correction
+        altitude_correction = calculate_altitude_correction(closest_alt, poi.altitude)
+        
+        # Final noise calculation
+        final_noise = baseline_noise - distance_attenuation - altitude_correction
+        
+        # Ensure noise doesn't go below background level
+        final_noise = max(final_noise, 30.0)  # Minimum background noise level
     
-    details = {
-        'aircraft_type': aircraft_data['type_designator'],
-        'manufacturer': aircraft_data['manufacturer'],
-        'model': aircraft_data['model'],
-        'wake_category': aircraft_data['wake_category'],
-        'engine_type': aircraft_data['engine_type'],
-        'min_distance': min_distance,
-        'closest_altitude': closest_alt,
-        'baseline_noise': baseline_noise,
-        'distance_attenuation': distance_attenuation,
-        'altitude_correction': altitude_correction,
-        'final_noise': final_noise
-    }
+    details = _noise_details(
+        aircraft_data, min_distance, closest_alt, baseline_noise, 
+        distance_attenuation, altitude_correction, final_noise
+    )
     
     return final_noise, details
 
@@ -248,11 +504,55 @@ def calculate_multiple_flights_noise(
     """
     results = {}
     
-    for flight_id in flight_ids:
-        noise_result = calculate_aircraft_noise(flight_id, poi, db_path)
-        if noise_result:
-            results[flight_id] = noise_result
+    # Fetch the aircraft of all flights at once instead of two queries per flight, the
+    # connection is only needed for this query so it is not kept open after the batch
+    try:
+        aircraft_by_flight = get_flights_aircraft_data(flight_ids, db_path)
+    finally:
+        _close_thread_connections()
+    
+    # Get the closest point of each flight in parallel, as each one reads its track from the
+    # database, the noise math is then done on all flights at once
+    from .distance import DistanceType, get_min_distance_with_details
+    
+    def closest_point(flight_id: str) -> Optional[Tuple[float, float, float, float]]:
+        if flight_id not in aircraft_by_flight:
+            return None
+        return get_min_distance_with_details(flight_id, poi, DistanceType.THREE_D, db_path)
+    
+    distance_results = []
+    if flight_ids:
+        with ThreadPoolExecutor(max_workers=min(32, len(flight_ids))) as executor:
+            distance_results = list(executor.map(closest_point, flight_ids))
+    
+    flights = []  # (flight_id, aircraft_data, min_distance, closest_alt)
+    for flight_id, distance_result in zip(flight_ids, distance_results):
+        aircraft_data = aircraft_by_flight.get(flight_id)
+        if distance_result:
+            min_distance, _, _, closest_alt = distance_result
+            flights.append((flight_id, aircraft_data, min_distance, closest_alt))
         else:
-            print(f"Could not calculate noise for flight {flight_id}")
+            log.debug("Could not calculate noise for flight %s", flight_id)
+    
+    if not flights:
+        return results
+    
+    baselines = get_baseline_noises(
+        [flight[1]['wake_category'] for flight in flights], 
+        [flight[1]['engine_type'] for flight in flights]
+    )
+    min_distances = np.array([flight[2] for flight in flights])
+    closest_alts = np.array([flight[3] for flight in flights])
+    
+    distance_attenuations, altitude_corrections, final_noises = _final_noise(
+        baselines, min_distances, closest_alts, poi.altitude_ft
+    )
+    
+    for i, (flight_id, aircraft_data, min_distance, closest_alt) in enumerate(flights):
+        final_noise = float(final_noises[i])
+        results[flight_id] = final_noise, _noise_details(
+            aircraft_data, min_distance, closest_alt, baselines[i].item(), 
+            float(distance_attenuations[i]), float(altitude_corrections[i]), final_noise
+        )
     
     return results
\ No newline at end of file